@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      adb_bench
+@time:      2025/10/18 16:40
+@author:    sMythicalBird
+"""
+"""
+adbtools 基准测试，基于本地假 adb server，不需要真机
+运行：python -m tests.adbtools.adb_bench --devices 32 --latency 0.002
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tests.adbtools.fake_adb import FakeAdbServer
+from utils.adbtools import AndroidController, AdbControllerConfig, AsyncAndroidController
+
+
+def new_controller(server: FakeAdbServer, **kwargs) -> AndroidController:
+    """AndroidController 是单例，基准测试之间需要重建，旧实例先关闭以释放 logcat 线程"""
+    if AndroidController._instance is not None:
+        AndroidController._instance.close()
+    return AndroidController(AdbControllerConfig(adb_host=server.host, adb_port=server.port, **kwargs))
+
+
+def _summary(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+    }
+
+
+# —————————————————— 基准项 ——————————————————
+
+def bench_controller_startup(server: FakeAdbServer, rounds: int = 20) -> dict:
+    """控制器初始化 + 列出并注册全部设备"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        controller = new_controller(server)
+        for serial in controller.devices.list():
+            controller.devices.add(serial)
+        samples.append(time.perf_counter() - start)
+    return _summary(samples)
+
+
+def bench_tap_throughput(server: FakeAdbServer, taps: int = 200) -> dict:
+    """单设备连续点击"""
+    controller = new_controller(server)
+    device = controller.devices.add(next(iter(server.devices)))
+    samples = []
+    start = time.perf_counter()
+    for i in range(taps):
+        t0 = time.perf_counter()
+        device.tap(i % 100, i % 100)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    return {**_summary(samples), "taps_per_s": taps / elapsed}
+
+
+def bench_batch_fanout(server: FakeAdbServer, rounds: int = 5) -> dict:
+    """batch_tap 随设备数增长的耗时"""
+    controller = new_controller(server)
+    serials = list(server.devices)
+    for serial in serials:
+        controller.devices.add(serial)
+    result = {}
+    n = 1
+    while True:
+        n = min(n, len(serials))
+        samples = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            controller.auto.batch_tap(serials[:n], 10, 10)
+            samples.append(time.perf_counter() - t0)
+        result[n] = statistics.fmean(samples) * 1000
+        if n == len(serials):
+            break
+        n *= 2
+    return {"mean_ms_by_devices": result}
+
+
+def bench_screenshot_latency(server: FakeAdbServer, shots: int = 30) -> dict:
+    """截图并保存 PNG"""
+    controller = new_controller(server)
+    device = controller.devices.add(next(iter(server.devices)))
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(shots):
+            t0 = time.perf_counter()
+            device.screenshot(Path(tmp) / f"{i}.png")
+            samples.append(time.perf_counter() - t0)
+    return _summary(samples)
+
+
+def bench_touch_latency(server: FakeAdbServer, taps: int = 200) -> dict:
+    """
+    shell input 与 minitouch socket 两种触摸后端的单次点击延迟对比
+    shell 计到命令返回；minitouch 的 tap 只是写入 socket，计到假代理收到最后一行提交指令（c）为止
+    注意假 server 的 forward 直连本地端口，不计 --latency，真机上 minitouch 还要加一次 adb 传输延迟
+    """
+    result = {}
+    serial = next(iter(server.devices))
+    fake = server.devices[serial]
+    for backend in ("shell", "minitouch"):
+        controller = new_controller(server, input_backend=backend)
+        device = controller.devices.add(serial)
+        device.tap(0, 0)  # 预热：建立 forward 与代理连接
+        if backend == "minitouch":
+            fake.wait_touches(4)
+        samples = []
+        for i in range(taps):
+            expected = len(fake.touches) + 4  # d / c / u / c
+            t0 = time.perf_counter()
+            device.tap(i % 100, i % 100)
+            if backend == "minitouch" and not fake.wait_touches(expected):
+                raise RuntimeError("假 minitouch 代理未收到点击指令")
+            samples.append(time.perf_counter() - t0)
+        result[backend] = _summary(samples)
+    return result
+
+
+def bench_async_fanout(server: FakeAdbServer, rounds: int = 5) -> dict:
+    """asyncio 接口并发点击全部设备（常驻 shell 会话）"""
+
+    async def _run() -> dict:
+        config = AdbControllerConfig(adb_host=server.host, adb_port=server.port)
+        async with AsyncAndroidController(config) as controller:
+            serials = await controller.devices.list()
+            # 第一轮建立会话，不计入结果
+            await controller.auto.batch_tap(serials, 10, 10)
+            samples = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                await controller.auto.batch_tap(serials, 10, 10)
+                samples.append(time.perf_counter() - t0)
+            return {"devices": len(serials), "mean_ms": statistics.fmean(samples) * 1000}
+
+    return asyncio.run(_run())
+
+
+BENCHMARKS = {
+    "controller_startup": bench_controller_startup,
+    "tap_throughput": bench_tap_throughput,
+    "batch_fanout": bench_batch_fanout,
+    "screenshot_latency": bench_screenshot_latency,
+    "async_fanout": bench_async_fanout,
+    "touch_latency": bench_touch_latency,
+}
+
+
+def run(
+    devices: int = 16,
+    latency: float = 0.0,
+    only: list[str] | None = None,
+    iterations: int | None = None,
+) -> dict:
+    """iterations 覆盖各基准项的轮数 / 次数（各 bench_* 的第二个参数），不传时用各自的默认值"""
+    results = {}
+    with FakeAdbServer(devices=devices, latency=latency) as server:
+        for name, bench in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            results[name] = bench(server, iterations) if iterations else bench(server)
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="adbtools 基准测试（假 adb server）")
+    parser.add_argument("--devices", type=int, default=16, help="虚拟设备数量")
+    parser.add_argument("--latency", type=float, default=0.0, help="每条 adb 命令的模拟延迟（秒）")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="只运行指定基准项")
+    parser.add_argument("--iterations", type=int, help="覆盖各基准项的轮数 / 次数")
+    parser.add_argument("--json", type=Path, help="结果另存为 JSON，便于对比基线")
+    args = parser.parse_args(argv)
+
+    results = run(args.devices, args.latency, args.only, args.iterations)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    print(text)
+    if args.json:
+        args.json.write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
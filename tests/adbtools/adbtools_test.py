@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      adbtools_test
+@time:      2025/10/18 17:02
+@author:    sMythicalBird
+"""
+"""
+基于假 adb server 的 adbtools 冒烟测试，同时保证包的导入不会再悄悄坏掉
+"""
+import asyncio
+import time
+
+import pytest
+from adbutils import AdbClient
+
+from tests.adbtools.fake_adb import FakeAdbServer
+from tests.adbtools.adb_bench import new_controller, run
+from utils.adbtools import AdbControllerConfig, AsyncAndroidController
+from utils.adbtools.record import TouchEvent, TouchPanel, build_script, find_touch_panel, load_events
+
+
+@pytest.fixture
+def server():
+    with FakeAdbServer(devices=4) as s:
+        yield s
+
+
+def test_package_exports():
+    import utils.adbtools as adbtools
+    for name in adbtools.__all__:
+        assert hasattr(adbtools, name)
+
+
+def test_devices_and_tap(server):
+    controller = new_controller(server)
+    serials = controller.devices.list()
+    assert serials == sorted(server.devices)
+
+    device = controller.devices.add(serials[0])
+    device.tap(100, 200)
+    assert server.devices[serials[0]].commands[-1] == "input tap 100 200"
+
+    for serial in serials:
+        controller.devices.add(serial)
+    controller.auto.batch_tap(serials, 5, 6)
+    assert all(d.commands[-1] == "input tap 5 6" for d in server.devices.values())
+
+
+def test_screenshot(server, tmp_path):
+    controller = new_controller(server)
+    device = controller.devices.add("fake-0000")
+    img = device.screenshot(tmp_path / "shot.png")
+    assert img.size == (1080, 2340)
+    assert (tmp_path / "shot.png").exists()
+
+
+def test_touch_record_round_trip(server, tmp_path):
+    controller = new_controller(server)
+    device = controller.devices.add("fake-0000")
+    assert find_touch_panel(device._adb) == TouchPanel("/dev/input/event2", 1079, 2339)
+
+    fake = server.devices["fake-0000"]
+    recorder = device.record_touch(tmp_path / "tap.ev")
+    frames = [(100.0, 540, 1170), (100.016, 545, 1180)]
+    for ts, x, y in frames:
+        fake.input_event(ts, 3, 0x35, x)
+        fake.input_event(ts, 3, 0x36, y)
+        fake.input_event(ts, 0, 0, 0)
+    fake.input_event(100.032, 3, 0x39, -1)
+    fake.input_event(100.032, 0, 0, 0)
+    deadline = time.monotonic() + 2
+    while recorder.count < 8:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    # getevent 连接仍然打开，stop() 也必须立即返回
+    start = time.monotonic()
+    assert recorder.stop() == 8
+    assert time.monotonic() - start < 1
+
+    source, events = load_events(tmp_path / "tap.ev")
+    assert source == TouchPanel("/dev/input/event2", 1079, 2339)
+    assert [e.delay_us for e in events] == [0, 0, 0, 16000, 0, 0, 16000, 0]
+    assert events[6] == TouchEvent(16000, 3, 0x39, -1)
+
+    # 每帧一次 print，按绝对时刻等待，坐标按目标屏缩放
+    script = build_script(events, source, TouchPanel("/dev/input/event5", 539, 1169))
+    assert "sendevent" not in script and "exec 3>/dev/input/event5" in script
+    assert script.count("print -n") == 3
+    assert "w 16000 0.016000" in script and "w 32000 0.016000" in script
+    first = script.split("print -n '")[1].split("'")[0]
+    raw = bytes(int(octal, 8) for octal in first.split("\\")[1:])
+    assert len(raw) == 3 * 24
+    assert int.from_bytes(raw[20:24], "little", signed=True) == 270
+
+
+def test_track_devices(server):
+    events = AdbClient(host=server.host, port=server.port).track_devices()
+    initial = {next(events).serial for _ in range(4)}
+    assert initial == set(server.devices)
+    server.add_device("fake-new")
+    event = next(events)
+    assert event.present and event.serial == "fake-new"
+
+
+def test_minitouch_backend(server):
+    server.add_device("fake-noagent", touch_agent=False)
+    controller = new_controller(server, input_backend="minitouch")
+
+    device = controller.devices.add("fake-0000")
+    device.tap(540, 1170)
+    device.gesture([[(100, 100), (50, 50)], [(200, 200), (250, 250)]], duration_ms=50)
+    fake = server.devices["fake-0000"]
+    deadline = time.monotonic() + 2
+    while fake.touches[-1:] != ["c"] or len(fake.touches) < 10:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert fake.touches[:4] == ["d 0 540 1170 50", "c", "u 0", "c"]
+    assert "d 1 200 200 50" in fake.touches
+    assert not any(c.startswith("input") for c in fake.commands)
+
+    # 没有代理的设备自动回退到 shell input
+    fallback = controller.devices.add("fake-noagent")
+    fallback.tap(1, 2)
+    assert server.devices["fake-noagent"].commands[-1] == "input tap 1 2"
+
+
+def test_minitouch_rotation(server):
+    fake = server.add_device("fake-rotated", rotation=1)
+    controller = new_controller(server, input_backend="minitouch", touch_rotation_interval=0)
+    device = controller.devices.add("fake-rotated")
+
+    # 横屏 (100, 200) 对应自然方向 (1080 - 200, 100)，再按 1079x2339 缩放
+    device.tap(100, 200)
+    fake.rotation = 3
+    device.tap(100, 200)
+    fake.rotation = 0
+    device.tap(100, 200)
+    deadline = time.monotonic() + 2
+    while len(fake.touches) < 12:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    downs = [t for t in fake.touches if t.startswith("d")]
+    assert downs == ["d 0 879 100 50", "d 0 200 2239 50", "d 0 100 200 50"]
+
+
+def test_logcat_ring_buffer(server, tmp_path):
+    controller = new_controller(server, logcat_buffer_bytes=400)
+    devices = [controller.devices.add(serial) for serial in sorted(server.devices)]
+    for device in devices:
+        device.start_logcat(tags=["App"], level="W")
+
+    fake = server.devices["fake-0000"]
+    fake.log("I", "App", "ignored by level")
+    fake.log("E", "Other", "ignored by tag")
+    for i in range(20):
+        fake.log("E", "App", f"crash {i:02d}")
+
+    stream = controller.logcat.get("fake-0000")
+    deadline = time.monotonic() + 2
+    while b"crash 19" not in stream.buffer.snapshot():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert stream.buffer.size <= 400 and stream.buffer.dropped > 0
+
+    text = devices[0].dump_logcat(tmp_path / "fail.log").read_text(encoding="utf-8")
+    assert "crash 19" in text and "crash 00" not in text and "ignored" not in text
+
+    # 重新 start 沿用未落盘的缓冲，从最后一行的时间续接，设备上的历史日志不会重复写入
+    other = server.devices["fake-0001"]
+    buffer = controller.logcat.get("fake-0001").buffer
+    for i in range(3):
+        other.log("E", "App", f"before {i}")
+    deadline = time.monotonic() + 2
+    while b"before 2" not in buffer.snapshot():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    devices[1].start_logcat(tags=["App"], level="W")
+    other.log("E", "App", "after restart")
+    while b"after restart" not in buffer.snapshot():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert [line.split(b": ")[-1] for line in buffer.snapshot().splitlines()] == [
+        b"before 0", b"before 1", b"before 2", b"after restart",
+    ]
+
+    # 再次 start 沿用缓冲；stop 之后仍可落盘，落盘后释放
+    assert devices[0].start_logcat(level="S").buffer is stream.buffer
+    fake.log("F", "App", "filtered by silent")
+    fake.log("S", "App", "silent line")
+    deadline = time.monotonic() + 2
+    while b"silent line" not in stream.buffer.snapshot():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    devices[0].stop_logcat()
+    text = devices[0].dump_logcat(tmp_path / "stopped.log").read_text(encoding="utf-8")
+    assert "crash 19" in text and "silent line" in text and "filtered" not in text
+    assert devices[0].dump_logcat() is None
+
+    devices[1].stop_logcat()
+    devices[1].clear_logcat()
+    assert controller.logcat.get("fake-0001") is None
+    # 关闭后读取线程退出，仍在采集的流被停止，缓冲仍可落盘
+    hub = controller.logcat
+    thread = hub._thread
+    controller.close()
+    assert not thread.is_alive() and hub._wake_r.fileno() == -1
+    assert not controller.logcat.get("fake-0002").alive
+    assert devices[2].dump_logcat(tmp_path / "closed.log").exists()
+    with pytest.raises(RuntimeError):
+        devices[3].start_logcat()
+
+
+def test_async_controller(server, tmp_path):
+    async def scenario():
+        config = AdbControllerConfig(adb_host=server.host, adb_port=server.port)
+        async with AsyncAndroidController(config) as controller:
+            serials = await controller.devices.list()
+            await controller.auto.batch_tap(serials, 1, 2)
+            device = controller.devices.get(serials[0])
+            await device.swipe(0, 0, 10, 10)
+            assert await device.shell("wm size") == "Physical size: 1080x2340"
+            img = await device.screenshot(tmp_path / "async.png")
+            frames = []
+            async for frame in device.frames():
+                frames.append(frame)
+                if len(frames) == 2:
+                    break
+            return serials, img, frames
+
+    serials, img, frames = asyncio.run(scenario())
+    assert all("input tap 1 2" in server.devices[s].commands for s in serials)
+    assert "input swipe 0 0 10 10" in server.devices[serials[0]].commands
+    assert img.size == (1080, 2340) and (tmp_path / "async.png").exists()
+    assert len(frames) == 2
+
+
+def test_async_shell_timeout():
+    async def scenario(server):
+        config = AdbControllerConfig(adb_host=server.host, adb_port=server.port)
+        async with AsyncAndroidController(config) as controller:
+            device = controller.devices.add("fake-0000")
+            assert await device.shell("echo ready") == "ready"
+            # 超时后丢弃会话，上一条命令的残留输出不会串到下一条命令
+            with pytest.raises(asyncio.TimeoutError):
+                await device.shell("wm size", timeout=0.05)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(device.shell("wm size"), 0.05)
+            return await device.shell("echo hello")
+
+    with FakeAdbServer(devices=1, latency=0.2) as server:
+        assert asyncio.run(scenario(server)) == "hello"
+
+
+def test_benchmarks_run():
+    # 冒烟测试只确认各基准项能跑通，次数取最小
+    results = run(devices=2, iterations=2)
+    assert results["tap_throughput"]["taps_per_s"] > 0
+    assert set(results["batch_fanout"]["mean_ms_by_devices"]) == {1, 2}
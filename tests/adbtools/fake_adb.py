@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      fake_adb
+@time:      2025/10/18 16:05
+@author:    sMythicalBird
+"""
+"""
+本地假 adb server
+实现 adbutils 用到的 host 协议子集：version、devices、track-devices、transport、shell（含 screencap）、exec、forward
+shell:sh 会话按行执行命令（echo 原样回显，"{ ... } </dev/null" 整组执行），用于测试常驻 shell
+logcat、getevent -t 为持续输出的流，内容由 FakeDevice.log() / input_event() 写入；
+logcat 与真机一样先输出设备上已有的历史日志（支持 -T 起始时间），再持续输出新日志
+forward 到 localabstract:minitouch 时在本地端口上模拟 minitouch 代理
+每条命令可配置固定延迟，可挂载任意数量的虚拟设备，用于在没有真机的 Linux 上跑回归和基准测试
+"""
+import io
+import re
+import queue
+import struct
+import threading
+import socketserver
+import time
+from typing import Callable, Optional
+
+from PIL import Image
+
+OKAY = b"OKAY"
+FAIL = b"FAIL"
+SERVER_VERSION = 41
+
+
+def _block(data: str | bytes) -> bytes:
+    """adb 长度前缀块：4 位十六进制长度 + 内容"""
+    if isinstance(data, str):
+        data = data.encode()
+    return b"%04x" % len(data) + data
+
+
+class FakeDevice:
+    """虚拟设备，记录收到的 shell 命令"""
+
+    def __init__(
+        self,
+        serial: str,
+        width: int = 1080,
+        height: int = 2340,
+        state: str = "device",
+        touch_agent: bool = True,
+        rotation: int = 0,
+    ):
+        self.serial = serial
+        self.width = width
+        self.height = height
+        self.state = state
+        self.touch_agent = touch_agent
+        self.rotation = rotation  # 屏幕方向 0~3，width/height 始终为自然方向尺寸
+        self.commands: list[str] = []
+        self.touches: list[str] = []  # minitouch 收到的指令
+        self.touch_changed = threading.Condition()
+        self.logcat_history: list[bytes] = []  # 设备上的 logcat 环形缓冲
+        self.logcat_readers: list[queue.Queue[bytes]] = []  # 每条 logcat 连接一个队列
+        self.logcat_lock = threading.Lock()
+        self.getevent_queue: queue.Queue[bytes] = queue.Queue()
+        self.handlers: dict[str, Callable[[str], bytes]] = {}
+        self._png: Optional[bytes] = None
+
+    def wait_touches(self, count: int, timeout: float = 2.0) -> bool:
+        """等待 minitouch 累计收到 count 行指令"""
+        with self.touch_changed:
+            return self.touch_changed.wait_for(lambda: len(self.touches) >= count, timeout)
+
+    def screencap(self) -> bytes:
+        if self._png is None:
+            buf = io.BytesIO()
+            Image.new("RGB", (self.width, self.height), (32, 64, 128)).save(buf, format="PNG")
+            self._png = buf.getvalue()
+        return self._png
+
+    def log(self, level: str, tag: str, message: str) -> None:
+        """写入一行 threadtime 格式日志：记入历史并推给所有已连接的 logcat 流"""
+        now = time.time()
+        stamp = time.strftime("%m-%d %H:%M:%S", time.localtime(now)) + f".{int(now * 1000) % 1000:03d}"
+        line = f"{stamp}  1000  1001 {level} {tag}: {message}\n".encode()
+        with self.logcat_lock:
+            self.logcat_history.append(line)
+            for reader in self.logcat_readers:
+                reader.put(line)
+
+    def logcat_connect(self, cmd: str) -> queue.Queue:
+        """新的 logcat 连接：先放入历史日志（-T 时只放该时刻及之后的），再接收新日志"""
+        m = re.search(r"-T '([^']+)'", cmd)
+        since = m.group(1).encode() if m else b""
+        reader = queue.Queue()
+        with self.logcat_lock:
+            for line in self.logcat_history:
+                if line[:len(since)] >= since:
+                    reader.put(line)
+            self.logcat_readers.append(reader)
+        return reader
+
+    def input_event(self, timestamp: float, etype: int, code: int, value: int) -> None:
+        """向 getevent -t 流写入一行事件"""
+        line = f"[{timestamp:14.6f}] {etype:04x} {code:04x} {value & 0xFFFFFFFF:08x}\n"
+        self.getevent_queue.put(line.encode())
+
+    def getevent_p(self) -> str:
+        return (
+            "add device 1: /dev/input/event2\n"
+            '  name:     "fake_touchscreen"\n'
+            "  events:\n"
+            "    ABS (0003): 0035  : value 0, min 0, max %d, fuzz 0, flat 0, resolution 0\n"
+            "                0036  : value 0, min 0, max %d, fuzz 0, flat 0, resolution 0\n"
+        ) % (self.width - 1, self.height - 1)
+
+    def shell(self, cmd: str) -> bytes:
+        self.commands.append(cmd)
+        for prefix, handler in self.handlers.items():
+            if cmd.startswith(prefix):
+                return handler(cmd)
+        if cmd.startswith("screencap"):
+            return self.screencap()
+        if cmd == "wm size":
+            return f"Physical size: {self.width}x{self.height}\n".encode()
+        if cmd == "getevent -p":
+            return self.getevent_p().encode()
+        if cmd == "dumpsys display":
+            return f"  mOverrideDisplayInfo=DisplayInfo{{rotation {self.rotation}}}, orientation={self.rotation}\n".encode()
+        return b""
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "_Server"
+
+    def _read_exact(self, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _read_command(self) -> str:
+        size = int(self._read_exact(4), 16)
+        return self._read_exact(size).decode()
+
+    def _fail(self, msg: str) -> None:
+        self.request.sendall(FAIL + _block(msg))
+
+    def handle(self) -> None:
+        fake = self.server.fake
+        try:
+            cmd = self._read_command()
+            fake.requests += 1
+            if not cmd.startswith(("host:tport:", "host:transport:")):
+                # 切换传输后的服务命令在 _transport 中计延迟，每条命令只计一次
+                fake.wait()
+            if cmd == "host:version":
+                self.request.sendall(OKAY + _block("%04x" % SERVER_VERSION))
+            elif cmd in ("host:devices", "host:devices-l"):
+                self.request.sendall(OKAY + _block(fake.device_list()))
+            elif cmd == "host:track-devices":
+                self._track_devices()
+            elif cmd.startswith("host:tport:serial:"):
+                device = self._select(cmd[len("host:tport:serial:"):])
+                if device:
+                    self.request.sendall(OKAY + struct.pack("<Q", 1))
+                    self._transport(device, self._read_command())
+            elif cmd.startswith("host:transport:"):
+                device = self._select(cmd[len("host:transport:"):])
+                if device:
+                    self.request.sendall(OKAY)
+                    self._transport(device, self._read_command())
+            elif cmd.startswith("host-serial:"):
+                serial, _, sub = cmd[len("host-serial:"):].partition(":")
+                device = self._select(serial)
+                if device:
+                    self._host_serial(device, sub)
+            else:
+                self._fail(f"unknown host service: {cmd}")
+        except (ConnectionError, OSError):
+            pass
+
+    def _select(self, serial: str) -> Optional[FakeDevice]:
+        device = self.server.fake.devices.get(serial)
+        if device is None:
+            self._fail(f"device '{serial}' not found")
+        return device
+
+    def _transport(self, device: FakeDevice, cmd: str) -> None:
+        self.server.fake.wait()
+        if cmd == "shell:sh":
+            self.request.sendall(OKAY)
+            self._session(device)
+        elif cmd.startswith("shell:logcat"):
+            reader = device.logcat_connect(cmd)
+            self.request.sendall(OKAY)
+            try:
+                self._stream(reader)
+            finally:
+                with device.logcat_lock:
+                    device.logcat_readers.remove(reader)
+        elif cmd.startswith("shell:getevent -t"):
+            self.request.sendall(OKAY)
+            self._stream(device.getevent_queue)
+        elif cmd.startswith("shell:") or cmd.startswith("exec:"):
+            cmd = cmd.partition(":")[2]
+            output = device.shell(cmd)
+            self.request.sendall(OKAY + output)
+        else:
+            self._fail(f"unsupported service: {cmd}")
+
+    def _session(self, device: FakeDevice) -> None:
+        stream = self.request.makefile("rb")
+        group: Optional[list[str]] = None
+        for line in stream:
+            line = line.decode().strip()
+            if not line:
+                continue
+            # "{ 命令" ... "} </dev/null" 为一组命令，整体执行
+            if group is None and line.startswith("{ "):
+                group = [line[2:]]
+            elif group is not None and line.startswith("}"):
+                for cmd in group:
+                    self._session_command(device, cmd)
+                group = None
+            elif group is not None:
+                group.append(line)
+            else:
+                self._session_command(device, line)
+
+    def _session_command(self, device: FakeDevice, cmd: str) -> None:
+        if cmd.startswith("echo "):
+            self.request.sendall(cmd[len("echo "):].encode() + b"\n")
+        else:
+            self.server.fake.wait()
+            self.request.sendall(device.shell(cmd))
+
+    def _stream(self, lines: queue.Queue) -> None:
+        """持续输出的命令（logcat、getevent），连接保持到客户端断开或服务关闭"""
+        fake = self.server.fake
+        while not fake.closed:
+            try:
+                self.request.sendall(lines.get(timeout=0.1))
+            except queue.Empty:
+                continue
+
+    def _host_serial(self, device: FakeDevice, sub: str) -> None:
+        fake = self.server.fake
+        if sub.startswith("forward:"):
+            local, _, remote = sub[len("forward:"):].partition(";")
+            fake.forward(device, local, remote)
+            self.request.sendall(OKAY)
+        elif sub == "list-forward":
+            lines = "".join(f"{serial} {local} {remote}\n" for serial, local, remote in fake.forwards)
+            self.request.sendall(OKAY + _block(lines))
+        elif sub == "get-state":
+            self.request.sendall(OKAY + _block(device.state))
+        else:
+            self._fail(f"unsupported service: {sub}")
+
+    def _track_devices(self) -> None:
+        fake = self.server.fake
+        self.request.sendall(OKAY)
+        last = None
+        while not fake.closed:
+            with fake.changed:
+                current = fake.device_list()
+                if current == last:
+                    fake.changed.wait(0.1)
+                    continue
+            self.request.sendall(_block(current))
+            last = current
+
+
+class _MinitouchHandler(socketserver.StreamRequestHandler):
+    """模拟 minitouch：发送横幅后记录收到的每行指令；代理不存在时像 adb forward 一样直接断开"""
+
+    def handle(self) -> None:
+        device = self.server.device
+        if not device.touch_agent:
+            return
+        banner = f"v 1\n^ 10 {device.width - 1} {device.height - 1} 255\n$ 4242\n"
+        self.wfile.write(banner.encode())
+        for line in self.rfile:
+            with device.touch_changed:
+                device.touches.append(line.decode().strip())
+                device.touch_changed.notify_all()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    fake: "FakeAdbServer"
+
+
+class FakeAdbServer:
+    """
+    用法：
+        with FakeAdbServer(devices=8, latency=0.002) as server:
+            client = AdbClient(port=server.port)
+    """
+
+    def __init__(self, devices: int = 1, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.devices: dict[str, FakeDevice] = {}
+        self.forwards: list[tuple[str, str, str]] = []
+        self._forward_servers: list[_Server] = []
+        self.requests = 0
+        self.closed = False
+        self.changed = threading.Condition()
+        for i in range(devices):
+            self.add_device(f"fake-{i:04d}")
+        self._server = _Server((host, port), _Handler)
+        self._server.fake = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    # —————————————————— 设备管理 ——————————————————
+
+    def add_device(self, serial: str, **kwargs) -> FakeDevice:
+        with self.changed:
+            device = self.devices[serial] = FakeDevice(serial, **kwargs)
+            self.changed.notify_all()
+        return device
+
+    def remove_device(self, serial: str) -> None:
+        with self.changed:
+            self.devices.pop(serial, None)
+            self.changed.notify_all()
+
+    def device_list(self) -> str:
+        return "".join(f"{d.serial}\t{d.state}\n" for d in list(self.devices.values()))
+
+    def forward(self, device: FakeDevice, local: str, remote: str) -> None:
+        self.forwards.append((device.serial, local, remote))
+        if remote == "localabstract:minitouch" and local.startswith("tcp:"):
+            server = _Server((self.host, int(local[len("tcp:"):])), _MinitouchHandler)
+            server.device = device
+            threading.Thread(name="fake-minitouch", target=server.serve_forever, daemon=True).start()
+            self._forward_servers.append(server)
+
+    def wait(self) -> None:
+        """模拟 adb 传输延迟"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    # —————————————————— 生命周期 ——————————————————
+
+    def start(self) -> "FakeAdbServer":
+        self._thread = threading.Thread(name="fake-adb", target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.closed = True
+        with self.changed:
+            self.changed.notify_all()
+        for server in [self._server, *self._forward_servers]:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self) -> "FakeAdbServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
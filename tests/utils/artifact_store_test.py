@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      artifact_store_test
+@time:      2025/10/19 17:05
+@author:    sMythicalBird
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from utils import ArtifactStore
+
+
+def test_dedup_and_baseline(tmp_path):
+    store = ArtifactStore(tmp_path, max_diff_ratio=0.0)
+    screen = Image.new("RGB", (540, 1170), (200, 200, 200))
+
+    first, again = store.put(screen), store.put(screen.copy())
+    assert first.new and not again.new and first.path == again.path
+    assert len(list((tmp_path / "objects").rglob("*.png"))) == 1
+
+    # 没有基线时登记为基线，索引落盘
+    assert store.compare("home", screen).baseline is None
+    assert ArtifactStore(tmp_path).baseline("home") == first.digest
+
+    # 比对一致的画面不入库
+    noisy = screen.copy()
+    noisy.putpixel((3, 3), (201, 200, 200))
+    assert store.compare("home", noisy).match
+    assert len(list((tmp_path / "objects").rglob("*.png"))) == 1
+
+    # 局部改动走全尺寸比对并给出差异区域
+    changed = screen.copy()
+    ImageDraw.Draw(changed).rectangle((100, 200, 140, 220), fill=(0, 0, 0))
+    result = store.compare("home", changed)
+    assert not result.match and result.bbox == (100, 200, 141, 221)
+    assert store.path_of(result.digest).exists()
+
+
+def test_thumbnail_shortcut(tmp_path):
+    screen = Image.new("RGB", (540, 1170), (200, 200, 200))
+    speck = screen.copy()
+    speck.putpixel((3, 3), (150, 200, 200))
+
+    # 默认容差下缩略图阶段即判定一致
+    loose = ArtifactStore(tmp_path / "loose")
+    loose.set_baseline("home", screen)
+    assert loose.compare("home", speck).match
+
+    # 严格比对不走缩略图捷径，单个像素的变化也能发现
+    strict = ArtifactStore(tmp_path / "strict", max_diff_ratio=0.0)
+    strict.set_baseline("home", screen)
+    result = strict.compare("home", speck)
+    assert not result.match and result.bbox == (3, 3, 4, 4)
+
+
+def test_concurrent_put(tmp_path):
+    screen = Image.new("RGB", (540, 1170), (200, 200, 200))
+    ImageDraw.Draw(screen).rectangle((10, 10, 300, 600), fill=(20, 120, 60))
+    for round_ in range(5):
+        # 每轮新建仓库，模拟多台设备同时存入同一画面
+        store = ArtifactStore(tmp_path / str(round_))
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: store.put(screen.copy()), range(8)))
+        assert sum(a.new for a in results) == 1
+        assert len({a.path for a in results}) == 1
+        assert store.load(results[0].digest).tobytes() == screen.tobytes()
+        assert [p.name for p in (tmp_path / str(round_)).rglob("*") if p.is_file()] == [results[0].path.name]
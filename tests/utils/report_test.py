@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      report_test
+@time:      2025/10/19 13:52
+@author:    sMythicalBird
+"""
+import xml.etree.ElementTree as ET
+
+from utils import ReportGenerator, TestResult
+
+
+def _results(n, shot_dir):
+    for i in range(n):
+        status = "failed" if i % 10 == 0 else "passed"
+        yield TestResult(
+            name=f"case_{i}",
+            classname="suite.demo",
+            status=status,
+            duration=0.01,
+            message="断言失败 <x>" if status == "failed" else "",
+            screenshots=[shot_dir / f"{i}.png"] if status == "failed" else [],
+        )
+
+
+def test_stream_report(tmp_path):
+    report = ReportGenerator(tmp_path / "report", suite_name="nightly", partial_every=25)
+    report.consume(_results(50, tmp_path / "shots"))
+
+    # 运行中的阶段性报告
+    suite = ET.parse(report.junit_path).getroot()[0]
+    assert suite.get("tests") == "50" and suite.get("failures") == "5"
+    assert "运行中" in report.html_path.read_text(encoding="utf-8")
+
+    report.consume(_results(10, tmp_path / "shots"))
+    report.close()
+
+    suite = ET.parse(report.junit_path).getroot()[0]
+    assert suite.get("tests") == "60" and suite.get("failures") == "6"
+    assert len(suite.findall("testcase")) == 60
+    page = report.html_path.read_text(encoding="utf-8")
+    assert "已完成" in page and "&lt;x&gt;" in page
+    assert 'src="../shots/0.png"' in page
+    assert not list((tmp_path / "report").glob("*.part"))
+    # 关闭后再次生成报告不做任何事
+    report.render()
+
+
+def test_control_characters(tmp_path):
+    with ReportGenerator(tmp_path / "report") as report:
+        report.add(TestResult(
+            name="case\x00_ansi",
+            status="error",
+            message="\x1b[1;31m未知异常\x1b[0m",
+            details="Traceback\x08\x0b\n\tline 1",
+        ))
+    case = ET.parse(report.junit_path).getroot()[0].find("testcase")
+    assert case.get("name") == "case_ansi"
+    error = case.find("error")
+    assert error.get("message") == "未知异常"
+    assert error.text == "Traceback\n\tline 1"
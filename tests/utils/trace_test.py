@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      trace_test
+@time:      2025/10/21 10:30
+@author:    sMythicalBird
+"""
+import json
+import logging
+
+import pytest
+
+from utils.basic import logger_manager, tracer, traced
+from utils.basic.trace import SpanFilter, TraceLogHandler
+
+
+@pytest.fixture
+def tracing():
+    """开启追踪；结束时撤销 enable_tracing() 对根日志器的改动，避免影响后续测试"""
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    saved = {h: (vars(h).get("emit"), vars(h).get("_traced"), list(h.filters)) for h in handlers}
+    tracer.clear()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.clear()
+
+    for handler in set(root.handlers) | set(handlers):
+        if isinstance(handler, TraceLogHandler) and handler not in saved:
+            root.removeHandler(handler)
+            continue
+        emit, traced_flag, filters = saved.get(handler, (None, None, None))
+        for attr, value in (("emit", emit), ("_traced", traced_flag)):
+            if value is None:
+                vars(handler).pop(attr, None)
+            else:
+                setattr(handler, attr, value)
+        handler.filters = filters if filters is not None else [
+            f for f in handler.filters if not isinstance(f, SpanFilter)
+        ]
+    assert root.handlers == handlers
+    assert all(vars(h).get("emit") is saved[h][0] for h in handlers)
+
+
+@traced("demo.inner", cat="test")
+def _inner(fail=False):
+    if fail:
+        raise ValueError("boom")
+    return tracer.current()
+
+
+@traced("demo.outer", cat="test")
+def _outer():
+    return _inner()
+
+
+def _spans():
+    return [e for e in tracer.events() if e["ph"] == "X"]
+
+
+def test_disabled_passthrough():
+    tracer.disable()
+    tracer.clear()
+    assert _inner() is None
+    assert tracer.span("noop") is tracer.span("other")
+    assert not [e for e in tracer.events() if e["ph"] != "M"]
+
+
+def test_nested_spans_and_errors(tracing):
+    assert _outer() == "demo.inner"
+    with pytest.raises(ValueError):
+        _inner(fail=True)
+
+    inner, outer, failed = _spans()
+    assert (inner["name"], outer["name"]) == ("demo.inner", "demo.outer")
+    # 内层 span 落在外层时间范围内
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert failed["args"] == {"error": "ValueError"} and "error" not in inner["args"]
+    assert tracer.current() is None
+
+
+def test_enable_tracing_idempotent(tracing):
+    root = logging.getLogger()
+    logger_manager.enable_tracing()
+    logger_manager.enable_tracing()
+    assert sum(isinstance(h, TraceLogHandler) for h in root.handlers) == 1
+    for handler in root.handlers:
+        if isinstance(handler, TraceLogHandler):
+            continue
+        # emit 只包一层，SpanFilter 只挂一个
+        assert not hasattr(handler.emit.__wrapped__, "__wrapped__")
+        assert sum(isinstance(f, SpanFilter) for f in handler.filters) == 1
+
+
+def test_export_chrome_json(tracing, tmp_path):
+    logger_manager.enable_tracing()
+    with tracer.span("demo.block", cat="test", step=1):
+        logging.getLogger("trace_test").info("inside block")
+
+    data = json.loads(logger_manager.export_trace(tmp_path / "trace.json").read_text(encoding="utf-8"))
+    events = data["traceEvents"]
+    assert data["displayTimeUnit"] == "ms"
+    assert all({"name", "ph", "pid", "tid"} <= e.keys() for e in events)
+    block = next(e for e in events if e["name"] == "demo.block")
+    assert block["args"] == {"step": 1} and block["dur"] >= 0
+    line = next(e for e in events if e["ph"] == "i" and "inside block" in e["name"])
+    assert line["args"]["span"] == "demo.block"
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+
+def test_span_in_log_format(tracing):
+    record = logging.LogRecord("trace_test", logging.INFO, __file__, 1, "msg", None, None)
+    SpanFilter().filter(record)
+    assert record.span == "-"
+    with tracer.span("demo.block"):
+        SpanFilter().filter(record)
+    assert record.span == "demo.block"
+    fmt = logger_manager.config["formatters"]["default"]["format"]
+    assert "{span}" in fmt
+    assert "demo.block" in logging.Formatter(fmt, style="{").format(record)
+
@@ -12,9 +12,14 @@
 基本功能模块：
 1、日志管理
 2、文件管理，单例文件控制类
+3、span 追踪，导出 Chrome trace
+4、流式测试报告，JUnit XML + HTML
+5、内容寻址截图仓库，去重与基线比对
 """
 # logger_manager用于新增日志器分类，logger可以直接使用, FileController用于文件操作
-from .basic import logger_manager, logger, FileController
+from .basic import logger_manager, logger, FileController, tracer, traced
+from .report_generator import ReportGenerator, TestResult
+from .artifact_store import ArtifactStore
 
 
 
@@ -22,5 +27,10 @@ __all__ = [
     "logger_manager",
     "logger",
     "FileController",
+    "tracer",
+    "traced",
+    "ReportGenerator",
+    "TestResult",
+    "ArtifactStore",
 ]
 
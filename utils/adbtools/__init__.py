@@ -9,14 +9,26 @@ from .core import AndroidController
 from .config import AdbControllerConfig
 
 # 可选：暴露子模块
-from .device_manager import DeviceManager
-from .scrcpy_controller import ScrcpyController
+from .devices import DeviceManager
+from .scrcpy import ScrcpyController
+from .record import TouchRecorder, TouchReplayer
+from .aio import AsyncAndroidController, AsyncAndroidDevice
+from .touch import MinitouchClient, TouchAgentError
+from .logcat import LogcatHub, LogcatFilter
 
 __all__ = [
     "AndroidController",
     "AdbControllerConfig",
     "DeviceManager",
-    "ScrcpyController"
+    "ScrcpyController",
+    "TouchRecorder",
+    "TouchReplayer",
+    "AsyncAndroidController",
+    "AsyncAndroidDevice",
+    "MinitouchClient",
+    "TouchAgentError",
+    "LogcatHub",
+    "LogcatFilter",
 ]
 
 
@@ -26,5 +38,9 @@ __all__ = [
 # ├── devices.py        # 设备管理
 # ├── scrcpy.py         # Scrcpy 投屏
 # ├── automation.py     # 自动化操作（点击、滑动）
+# ├── record.py         # 触摸录制与回放
+# ├── aio.py            # asyncio 控制接口
+# ├── touch.py          # minitouch socket 触摸注入
+# ├── logcat.py         # 流式 logcat 采集
 # ├── config.py         # 配置管理
 # └── utils.py          # 工具函数
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      aio
+@time:      2025/10/19 09:30
+@author:    sMythicalBird
+"""
+"""
+asyncio 版本的 Android 控制接口
+直接用 asyncio stream 实现 adb host 协议，单个事件循环即可驱动上百台设备：
+- 每台设备保持一条常驻 shell 会话，tap/swipe 等命令复用该连接，不再每次新建 socket
+- 截图等二进制输出走一次性的 exec: 连接，并发数由信号量限制
+同步接口（AndroidController）保持不变
+"""
+import io
+import asyncio
+import logging
+import itertools
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from PIL import Image
+
+from .config import AdbControllerConfig
+
+logger = logging.getLogger(__name__)
+
+_OKAY = b"OKAY"
+_FAIL = b"FAIL"
+# StreamReader 缓冲上限，需容纳一整张截图
+_STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class AdbProtocolError(Exception):
+    """adb server 返回 FAIL 或数据不符合协议"""
+    pass
+
+
+# =============================
+# adb host 协议客户端
+# =============================
+class AsyncAdbClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 5037, max_connections: int = 64):
+        self.host = host
+        self.port = port
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection(self.host, self.port, limit=_STREAM_LIMIT)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, cmd: str) -> None:
+        data = cmd.encode()
+        writer.write(b"%04x" % len(data) + data)
+        await writer.drain()
+
+    @staticmethod
+    async def _read_block(reader: asyncio.StreamReader) -> str:
+        size = int(await reader.readexactly(4), 16)
+        return (await reader.readexactly(size)).decode(errors="replace")
+
+    async def _check_okay(self, reader: asyncio.StreamReader) -> None:
+        status = await reader.readexactly(4)
+        if status == _OKAY:
+            return
+        if status == _FAIL:
+            raise AdbProtocolError(await self._read_block(reader))
+        raise AdbProtocolError(f"Unknown data: {status!r}")
+
+    # —————————————————— host 服务 ——————————————————
+
+    async def host_command(self, cmd: str) -> str:
+        """执行返回单个长度前缀块的 host 命令，如 host:version、host:devices"""
+        reader, writer = await self._connect()
+        try:
+            await self._send(writer, cmd)
+            await self._check_okay(reader)
+            return await self._read_block(reader)
+        finally:
+            writer.close()
+
+    async def server_version(self) -> int:
+        return int(await self.host_command("host:version"), 16)
+
+    async def device_list(self) -> list[str]:
+        output = await self.host_command("host:devices")
+        serials = []
+        for line in output.splitlines():
+            fields = line.strip().split("\t")
+            if len(fields) == 2 and fields[1] == "device":
+                serials.append(fields[0])
+        return serials
+
+    async def track_devices(self) -> AsyncIterator[tuple[str, str]]:
+        """持续产出 (serial, state)，设备断开时 state 为 absent"""
+        reader, writer = await self._connect()
+        try:
+            await self._send(writer, "host:track-devices")
+            await self._check_okay(reader)
+            known: dict[str, str] = {}
+            while True:
+                current = {}
+                for line in (await self._read_block(reader)).splitlines():
+                    fields = line.strip().split("\t")
+                    if len(fields) == 2:
+                        current[fields[0]] = fields[1]
+                for serial in known.keys() - current.keys():
+                    yield serial, "absent"
+                for serial, state in current.items():
+                    if known.get(serial) != state:
+                        yield serial, state
+                known = current
+        finally:
+            writer.close()
+
+    # —————————————————— 设备服务 ——————————————————
+
+    async def open_service(self, serial: str, service: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """切换到指定设备的 transport 并打开服务，返回该连接"""
+        reader, writer = await self._connect()
+        try:
+            await self._send(writer, f"host:transport:{serial}")
+            await self._check_okay(reader)
+            await self._send(writer, service)
+            await self._check_okay(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def exec_out(self, serial: str, cmd: str) -> bytes:
+        """一次性执行命令并读取原始输出（不做换行转换，适合二进制）"""
+        async with self._slots:
+            reader, writer = await self.open_service(serial, f"exec:{cmd}")
+            try:
+                return await reader.read()
+            finally:
+                writer.close()
+
+
+# =============================
+# 设备
+# =============================
+class AsyncAndroidDevice:
+    def __init__(self, controller: "AsyncAndroidController", serial: str):
+        self.controller = controller
+        self.serial = serial
+        self._client = controller.adb_client
+        self._session: Optional[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._lock = asyncio.Lock()
+        self._seq = itertools.count()
+
+    async def _open_session(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self._session is None:
+            self._session = await self._client.open_service(self.serial, "shell:sh")
+        return self._session
+
+    async def _run(self, cmd: str) -> bytes:
+        reader, writer = await self._open_session()
+        if reader.at_eof() or writer.is_closing():
+            # 会话已被对端关闭（设备断开、adb server 重启），命令尚未发出，重连即可
+            await self._close_session()
+            reader, writer = await self._open_session()
+        marker = f"__AUTOTEST_END_{next(self._seq)}__".encode()
+        # 命令的标准输入指向 /dev/null，避免读 stdin 的命令吞掉后面的结束标记
+        writer.write(b"{ " + cmd.encode() + b"\n} </dev/null\necho " + marker + b"\n")
+        await writer.drain()
+        data = await reader.readuntil(marker + b"\n")
+        return data[: -len(marker) - 1]
+
+    async def shell(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """
+        在常驻 shell 会话中执行命令
+        发出命令后出错、超时或被取消时，会话中可能残留未读完的输出，直接丢弃会话，下次调用重新打开；
+        命令可能已经执行，因此不自动重试
+        """
+        async with self._lock:
+            try:
+                output = await asyncio.wait_for(self._run(cmd), timeout or self.controller.config.shell_timeout)
+            except BaseException:
+                await self._close_session()
+                raise
+        return output.decode(errors="replace").rstrip()
+
+    async def tap(self, x, y) -> str:
+        return await self.shell(f"input tap {x} {y}")
+
+    async def swipe(self, x1, y1, x2, y2) -> str:
+        return await self.shell(f"input swipe {x1} {y1} {x2} {y2}")
+
+    async def screencap(self) -> bytes:
+        """PNG 原始字节"""
+        return await self._client.exec_out(self.serial, "screencap -p")
+
+    async def screenshot(self, path=None) -> Image.Image:
+        png = await self.screencap()
+        # PNG 解码与保存放到线程池，避免阻塞事件循环
+        return await asyncio.to_thread(_decode_png, png, path)
+
+    async def frames(self, interval: float = 0.0) -> AsyncIterator[Image.Image]:
+        """连续截图：async for frame in device.frames(): ..."""
+        while True:
+            yield await self.screenshot()
+            if interval:
+                await asyncio.sleep(interval)
+
+    async def _close_session(self) -> None:
+        if self._session is not None:
+            _, writer = self._session
+            self._session = None
+            writer.close()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close_session()
+
+
+def _decode_png(png: bytes, path=None) -> Image.Image:
+    img = Image.open(io.BytesIO(png))
+    img.load()
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        img.save(path)
+    return img
+
+
+# =============================
+# 设备管理与控制器
+# =============================
+class AsyncDeviceManager:
+    def __init__(self, controller: "AsyncAndroidController"):
+        self.controller = controller
+        self._devices: dict[str, AsyncAndroidDevice] = {}
+
+    def add(self, serial: str) -> AsyncAndroidDevice:
+        if serial not in self._devices:
+            self._devices[serial] = AsyncAndroidDevice(self.controller, serial)
+        return self._devices[serial]
+
+    def get(self, serial: str) -> Optional[AsyncAndroidDevice]:
+        return self._devices.get(serial)
+
+    async def list(self) -> list[str]:
+        return await self.controller.adb_client.device_list()
+
+    async def remove(self, serial: str) -> None:
+        device = self._devices.pop(serial, None)
+        if device:
+            await device.close()
+
+    async def close(self) -> None:
+        devices = list(self._devices.values())
+        self._devices.clear()
+        await asyncio.gather(*(d.close() for d in devices))
+
+
+class AsyncAutomationHelper:
+    def __init__(self, controller: "AsyncAndroidController"):
+        self.controller = controller
+
+    async def batch_tap(self, serial_list, x, y) -> None:
+        """并发点击多台设备"""
+        devices = [self.controller.devices.add(serial) for serial in serial_list]
+        await asyncio.gather(*(d.tap(x, y) for d in devices))
+
+
+class AsyncAndroidController:
+    """
+    asyncio 控制器，绑定创建它的事件循环，因此不做成单例
+        async with AsyncAndroidController() as controller:
+            device = controller.devices.add(serial)
+            await device.tap(100, 200)
+    """
+
+    def __init__(self, config: Optional[AdbControllerConfig] = None):
+        self.config = config or AdbControllerConfig()
+        self.adb_client = AsyncAdbClient(
+            host=self.config.adb_host,
+            port=self.config.adb_port,
+            max_connections=self.config.max_connections,
+        )
+        self.devices = AsyncDeviceManager(self)
+        self.auto = AsyncAutomationHelper(self)
+        logger.info("AsyncAndroidController 初始化完成")
+
+    async def close(self) -> None:
+        await self.devices.close()
+
+    async def __aenter__(self) -> "AsyncAndroidController":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
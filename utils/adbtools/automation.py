@@ -4,27 +4,124 @@
 @time:      2025/9/27 03:53
 @author:    sMythicalBird
 """
+import logging
+
+from ..basic.trace import traced
+from .record import TouchRecorder, TouchReplayer
+from .touch import MinitouchClient, TouchAgentError
+
+logger = logging.getLogger(__name__)
+
+
 class AndroidDevice:
     def __init__(self, controller, serial: str):
         self.controller = controller
         self.serial = serial
         self._adb = controller.adb_client.device(serial)
+        self._touch = None
+        self._touch_failed = False
+
+    def _touch_agent(self):
+        """按配置返回 socket 触摸代理，不可用时返回 None（走 shell input）"""
+        if self.controller.config.input_backend != "minitouch" or self._touch_failed:
+            return None
+        if self._touch is None:
+            self._touch = MinitouchClient(self, self.controller.config)
+        return self._touch
 
+    def _touch_fallback(self, e: TouchAgentError) -> None:
+        logger.warning("触摸代理不可用，回退到 shell input: %s", e)
+        self._touch_failed = True
+        self._touch.close()
+
+    @traced("device.tap", cat="adb")
     def tap(self, x, y):
+        touch = self._touch_agent()
+        if touch is not None:
+            try:
+                return touch.tap(x, y)
+            except TouchAgentError as e:
+                self._touch_fallback(e)
         return self._adb.shell(f"input tap {x} {y}")
 
-    def swipe(self, x1, y1, x2, y2):
-        return self._adb.shell(f"input swipe {x1} {y1} {x2} {y2}")
+    @traced("device.swipe", cat="adb")
+    def swipe(self, x1, y1, x2, y2, duration_ms=None):
+        touch = self._touch_agent()
+        if touch is not None:
+            try:
+                return touch.swipe(x1, y1, x2, y2, duration_ms or 300)
+            except TouchAgentError as e:
+                self._touch_fallback(e)
+        cmd = f"input swipe {x1} {y1} {x2} {y2}"
+        if duration_ms:
+            cmd += f" {duration_ms}"
+        return self._adb.shell(cmd)
+
+    @traced("device.gesture", cat="adb")
+    def gesture(self, paths, duration_ms=300):
+        """多点手势，需要 minitouch 后端；单条轨迹时可回退为 shell swipe"""
+        touch = self._touch_agent()
+        if touch is not None:
+            try:
+                return touch.gesture(paths, duration_ms)
+            except TouchAgentError as e:
+                self._touch_fallback(e)
+        if len(paths) != 1:
+            raise TouchAgentError("多点手势需要 minitouch 触摸代理")
+        (x1, y1), (x2, y2) = paths[0][0], paths[0][-1]
+        return self.swipe(x1, y1, x2, y2, duration_ms)
 
+    @traced("device.screenshot", cat="adb")
     def screenshot(self, path):
         img = self._adb.screenshot()
         img.save(path)
         return img
 
+    def start_logcat(self, tags=None, level=None, pattern=None, max_bytes=None):
+        """后台持续采集 logcat 到内存环形缓冲，返回 LogcatStream"""
+        return self.controller.logcat.start(self, tags, level, pattern, max_bytes)
+
+    def stop_logcat(self):
+        """停止采集，缓冲保留到 dump_logcat() 或 clear_logcat()"""
+        self.controller.logcat.stop(self.serial)
+
+    def clear_logcat(self):
+        """停止采集并丢弃缓冲"""
+        self.controller.logcat.clear(self.serial)
+
+    @traced("device.dump_logcat", cat="adb")
+    def dump_logcat(self, path=None):
+        """把缓冲中的 logcat 写入文件（失败时或按需调用），返回文件路径"""
+        return self.controller.logcat.dump(self.serial, path)
+
+    @traced("device.capture", cat="adb")
+    def capture(self):
+        """截图存入内容寻址仓库，相同画面只落盘一次，返回 Artifact"""
+        img = self._adb.screenshot()
+        return self.controller.artifacts.put(img)
+
+    @traced("device.check_screen", cat="adb")
+    def check_screen(self, step: str):
+        """截图并与该步骤的基线比对，返回 DiffResult"""
+        img = self._adb.screenshot()
+        return self.controller.artifacts.compare(step, img)
+
+    def record_touch(self, path) -> TouchRecorder:
+        """开始录制触摸事件，返回录制器，调用 stop() 结束"""
+        return TouchRecorder(self).start(path)
+
+    @traced("device.replay_touch", cat="adb")
+    def replay_touch(self, path) -> int:
+        """在设备端按原始时序回放触摸事件日志"""
+        if not hasattr(self, "_replayer"):
+            self._replayer = TouchReplayer(self)
+        return self._replayer.replay(path)
+
 class AutomationHelper:
     def __init__(self, controller):
         self.controller = controller
 
+    @traced("auto.batch_tap", cat="adb")
     def batch_tap(self, serial_list, x, y):
         for serial in serial_list:
             dev = self.controller.devices.get(serial)
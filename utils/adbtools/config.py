@@ -12,6 +12,23 @@ class AdbControllerConfig:
         self.default_max_width = kwargs.get("default_max_width", 720)
         self.default_bit_rate = kwargs.get("default_bit_rate", "4M")
         self.log_level = kwargs.get("log_level", "INFO")
+        # asyncio 接口同时打开的一次性 adb 连接上限
+        self.max_connections = kwargs.get("max_connections", 64)
+        # asyncio 接口常驻 shell 会话中单条命令的超时（秒），超时后丢弃会话
+        self.shell_timeout = kwargs.get("shell_timeout", 30.0)
+        # 截图仓库目录，默认 res/artifacts
+        self.artifact_dir = kwargs.get("artifact_dir", None)
+        # 触摸注入方式：shell（input 命令）或 minitouch（socket 常驻代理，失败自动回退 shell）
+        self.input_backend = kwargs.get("input_backend", "shell")
+        self.touch_agent_path = kwargs.get("touch_agent_path", "/data/local/tmp/minitouch")
+        # 设备上没有代理时推送的本地二进制（需与设备 ABI 匹配）
+        self.touch_agent_binary = kwargs.get("touch_agent_binary", None)
+        self.touch_agent_timeout = kwargs.get("touch_agent_timeout", 3.0)
+        # 屏幕方向缓存的有效期（秒），过期后下一次手势前重新读取，0 表示每次手势都读取
+        self.touch_rotation_interval = kwargs.get("touch_rotation_interval", 1.0)
+        # 流式 logcat：每台设备环形缓冲的字节上限、logcat 参数（解析依赖 threadtime 格式）
+        self.logcat_buffer_bytes = kwargs.get("logcat_buffer_bytes", 4 * 1024 * 1024)
+        self.logcat_args = kwargs.get("logcat_args", "-v threadtime")
 
     def update(self, **kwargs):
         for k, v in kwargs.items():
@@ -12,6 +12,8 @@ from adbutils import AdbClient
 from .devices import DeviceManager
 from .scrcpy import ScrcpyController
 from .automation import AutomationHelper
+from .logcat import LogcatHub
+from ..artifact_store import ArtifactStore
 
 
 logger = logging.getLogger(__name__)
@@ -36,6 +38,15 @@ class AndroidController:
         self.devices = DeviceManager(self)
         self.scrcpy = ScrcpyController(self)
         self.auto = AutomationHelper(self)
+        self.artifacts = ArtifactStore(self.config.artifact_dir)
+        self.logcat = LogcatHub(self)
 
         self.initialized = True
-        logger.info("AndroidController 初始化完成")
\ No newline at end of file
+        logger.info("AndroidController 初始化完成")
+
+    def close(self):
+        """释放后台资源（logcat 读取线程等），之后可重新创建控制器"""
+        self.logcat.close()
+        if AndroidController._instance is self:
+            AndroidController._instance = None
+        logger.info("AndroidController 已关闭")
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      logcat
+@time:      2025/10/20 15:40
+@author:    sMythicalBird
+"""
+"""
+流式 logcat 采集
+- 每台设备一条常驻 logcat 连接，所有连接由同一个 selector 线程读取，设备再多也只有一个线程
+- 按行增量解析，标签/级别/正则过滤条件预先编译
+- 每台设备一个按字节数限长的环形缓冲，只在失败或手动调用时通过 FileController 落盘
+- stop() 只断开连接，缓冲保留到落盘或 clear() 为止；重新 start() 时沿用原有缓冲，
+  并用 -T 从缓冲中最后一行的时间继续读取，避免 logcat 把设备上的历史日志再输出一遍
+"""
+import re
+import time
+import socket
+import logging
+import selectors
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Optional
+
+from config import PATHS
+from ..basic import FileController
+
+logger = logging.getLogger(__name__)
+
+LEVELS = "VDIWEFS"  # S 即 logcat 的 Silent，只放行 S 级别的行
+# logcat -v threadtime：10-18 12:34:56.789  1234  5678 I Tag     : message
+_THREADTIME_RE = re.compile(rb"^\S+\s+\S+\s+\d+\s+\d+\s+([VDIWEFS])\s+(.*?)\s*: ")
+# 行首时间戳，即 logcat -T 接受的格式
+_STAMP_RE = re.compile(rb"^(\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s")
+
+
+def _stamp(line: bytes) -> Optional[bytes]:
+    m = _STAMP_RE.match(line)
+    return m.group(1) if m else None
+
+
+class LogcatFilter:
+    """标签 / 最低级别 / 正则过滤，条件都为空时直接放行"""
+
+    def __init__(
+        self,
+        tags: Optional[Iterable[str]] = None,
+        level: Optional[str] = None,
+        pattern: Optional[str] = None,
+    ):
+        self.tags = {t.encode() for t in tags} if tags else None
+        self.min_level = LEVELS.index(level.upper()[0]) if level else 0
+        self.pattern = re.compile(pattern.encode()) if pattern else None
+        self.passthrough = self.tags is None and not self.min_level and self.pattern is None
+
+    def match(self, line: bytes) -> bool:
+        if self.passthrough:
+            return True
+        if self.tags is not None or self.min_level:
+            m = _THREADTIME_RE.match(line)
+            if m is None:
+                return False
+            level, tag = m.groups()
+            if self.tags is not None and tag not in self.tags:
+                return False
+            if self.min_level and LEVELS.find(level.decode()) < self.min_level:
+                return False
+        return self.pattern is None or self.pattern.search(line) is not None
+
+
+class LogcatBuffer:
+    """按字节数限长的环形缓冲，超出时丢弃最旧的行"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped = 0
+        self._lines: deque[bytes] = deque()
+        self._lock = threading.Lock()
+
+    def extend(self, lines: list[bytes]) -> None:
+        with self._lock:
+            for line in lines:
+                self._lines.append(line)
+                self.size += len(line)
+            while self.size > self.max_bytes and self._lines:
+                self.size -= len(self._lines.popleft())
+                self.dropped += 1
+
+    def snapshot(self) -> bytes:
+        with self._lock:
+            return b"".join(self._lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
+            self.size = 0
+
+    def last_line(self) -> Optional[bytes]:
+        with self._lock:
+            return self._lines[-1].rstrip(b"\r\n") if self._lines else None
+
+
+class LogcatStream:
+    """单台设备的 logcat 流"""
+
+    def __init__(self, device, log_filter: LogcatFilter, max_bytes: int, buffer: Optional[LogcatBuffer] = None):
+        self.device = device
+        self.filter = log_filter
+        self.buffer = buffer or LogcatBuffer(max_bytes)
+        self.buffer.max_bytes = max_bytes
+        self.alive = False
+        self._conn = None
+        self._pending = b""
+        # 续接旧缓冲时的 (时间戳, 缓冲最后一行)：-T 包含该时刻本身，同一时刻直到该行为止的输出已处理过
+        self._resume: Optional[tuple[bytes, bytes]] = None
+
+    def open(self, args: str = "-v threadtime") -> socket.socket:
+        last = self.buffer.last_line()
+        stamp = _stamp(last) if last else None
+        if stamp:
+            self._resume = (stamp, last)
+            args = f"-T '{stamp.decode()}' {args}"
+        self._conn = self.device._adb.shell(f"logcat {args}", stream=True)
+        sock = self._conn.conn
+        sock.setblocking(False)
+        self.alive = True
+        return sock
+
+    def feed(self, data: bytes) -> None:
+        """处理一块原始数据，不完整的末行留到下次"""
+        data = self._pending + data
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        if self._resume:
+            lines = self._skip_seen(lines)
+        matched = [line + b"\n" for line in lines if line and self.filter.match(line.rstrip(b"\r"))]
+        if matched:
+            self.buffer.extend(matched)
+
+    def _skip_seen(self, lines: list[bytes]) -> list[bytes]:
+        stamp, last = self._resume
+        for i, line in enumerate(lines):
+            line = line.rstrip(b"\r")
+            if _stamp(line) != stamp:
+                self._resume = None
+                return lines[i:]
+            if line == last:
+                self._resume = None
+                return lines[i + 1:]
+        return []
+
+    def close(self) -> None:
+        self.alive = False
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class LogcatHub:
+    """
+    所有设备共用的 logcat 读取线程（selector 多路复用）
+    注册 / 注销通过队列交给读取线程处理，避免跨线程修改 selector
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self._selector = selectors.DefaultSelector()
+        self._streams: dict[str, LogcatStream] = {}
+        self._ops: deque = deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._fc = FileController()
+
+    # —————————————————— 对外接口 ——————————————————
+
+    def start(self, device, tags=None, level=None, pattern=None, max_bytes=None) -> LogcatStream:
+        """开始采集；该设备已有的流会被断开，尚未落盘的缓冲由新的流从最后一行的时间处续接"""
+        cfg = self.controller.config
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LogcatHub 已关闭")
+            previous = self._streams.get(device.serial)
+            if previous is not None:
+                self.stop(device.serial)
+            stream = LogcatStream(
+                device,
+                LogcatFilter(tags, level, pattern),
+                max_bytes or cfg.logcat_buffer_bytes,
+                previous.buffer if previous else None,
+            )
+            sock = stream.open(cfg.logcat_args)
+            self._streams[device.serial] = stream
+            self._submit(("add", sock, stream))
+            if self._thread is None:
+                self._thread = threading.Thread(name="logcat-hub", target=self._loop, daemon=True)
+                self._thread.start()
+        return stream
+
+    def stop(self, serial: str) -> None:
+        """断开连接，缓冲保留到 dump() 或 clear()"""
+        stream = self._streams.get(serial)
+        if stream is not None and stream.alive:
+            # 立即标记，读取线程不再向缓冲写入
+            stream.alive = False
+            self._submit(("remove", stream))
+
+    def clear(self, serial: str) -> None:
+        """停止采集并丢弃缓冲"""
+        self.stop(serial)
+        self._streams.pop(serial, None)
+
+    def close(self) -> None:
+        """停止所有流并结束读取线程，释放 selector 与唤醒 socket；已有缓冲仍可 dump()"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for serial in list(self._streams):
+                self.stop(serial)
+            thread = self._thread
+            if thread is not None:
+                self._submit(("close",))
+        if thread is not None:
+            thread.join(timeout=2)
+            if thread.is_alive():
+                logger.warning("logcat 读取线程未能退出")
+                return
+        for stream in self._streams.values():
+            stream.close()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def get(self, serial: str) -> Optional[LogcatStream]:
+        return self._streams.get(serial)
+
+    def dump(self, serial: str, file_path: Optional[str | Path] = None) -> Optional[Path]:
+        """把缓冲写入文件，默认 logs/logcat/<serial>-<时间>.log；已停止的流落盘后即释放"""
+        stream = self._streams.get(serial)
+        if stream is None:
+            return None
+        if not stream.alive:
+            self._streams.pop(serial, None)
+        if file_path is None:
+            name = f"{serial.replace(':', '_')}-{time.strftime('%Y%m%d-%H%M%S')}.log"
+            file_path = PATHS["logs"] / "logcat" / name
+        self._fc.write_text(stream.buffer.snapshot().decode("utf-8", errors="replace"), file_path)
+        return Path(file_path)
+
+    def dump_all(self, directory: Optional[str | Path] = None) -> list[Path]:
+        """测试失败时一次性落盘所有设备的缓冲"""
+        paths = []
+        for serial in list(self._streams):
+            file_path = Path(directory) / f"{serial.replace(':', '_')}.log" if directory else None
+            path = self.dump(serial, file_path)
+            if path:
+                paths.append(path)
+        return paths
+
+    # —————————————————— 读取线程 ——————————————————
+
+    def _submit(self, op: tuple) -> None:
+        self._ops.append(op)
+        self._wake_w.send(b"\0")
+
+    def _apply_ops(self) -> bool:
+        """处理排队的注册 / 注销，收到 close 时返回 False"""
+        while self._ops:
+            op = self._ops.popleft()
+            if op[0] == "add":
+                _, sock, stream = op
+                self._selector.register(sock, selectors.EVENT_READ, stream)
+            elif op[0] == "remove":
+                self._unregister(op[1])
+            else:
+                return False
+        return True
+
+    def _unregister(self, stream: LogcatStream) -> None:
+        if stream._conn is not None:
+            try:
+                self._selector.unregister(stream._conn.conn)
+            except (KeyError, ValueError):
+                pass
+        stream.close()
+
+    def _loop(self) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj is self._wake_r:
+                    try:
+                        self._wake_r.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    if not self._apply_ops():
+                        return
+                    continue
+                stream: LogcatStream = key.data
+                if not stream.alive:
+                    # 同一批事件中已被注销的流
+                    continue
+                try:
+                    data = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b""
+                if data:
+                    stream.feed(data)
+                else:
+                    logger.warning("logcat 流已断开: %s", stream.device.serial)
+                    self._unregister(stream)
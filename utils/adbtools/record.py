@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      record
+@time:      2025/10/18 10:12
+@author:    sMythicalBird
+"""
+"""
+触摸录制与回放
+录制：流式读取设备端 getevent 输出，写成紧凑的二进制事件日志（每个事件 12 字节）
+回放：按 SYN_REPORT 把事件分帧，每帧打包成内核 struct input_event，由设备端脚本
+     用内建 print 一次写入输入设备节点（不再为每个事件启动 sendevent 进程）；
+     等待时间按相对起始时刻的绝对时间计算，sleep 自身的开销不会累积；
+     坐标按源/目标触摸屏的坐标范围缩放，适配不同分辨率
+"""
+import re
+import socket
+import struct
+import logging
+import threading
+from pathlib import Path
+from typing import NamedTuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+# —————————————————— 日志格式 ——————————————————
+
+MAGIC = b"ATEV"
+VERSION = 1
+
+# 文件头：魔数、版本、保留位、X 轴最大值、Y 轴最大值、录制时的输入设备路径
+_HEADER = struct.Struct("<4sHHii64s")
+# 单个事件：距上一事件的微秒间隔、type、code、value
+_EVENT = struct.Struct("<IHHi")
+
+EV_SYN = 0x00
+EV_ABS = 0x03
+SYN_REPORT = 0x00
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+
+_X_CODES = (ABS_X, ABS_MT_POSITION_X)
+_Y_CODES = (ABS_Y, ABS_MT_POSITION_Y)
+
+# getevent -p 输出中的设备行、坐标轴行
+_DEVICE_RE = re.compile(r"add device \d+:\s*(\S+)")
+_AXIS_RE = re.compile(r"([0-9a-f]{4})\s*:\s*value -?\d+, min -?\d+, max (-?\d+)")
+# getevent -t <dev> 输出：[   51234.123456] 0003 0035 000001f4
+_EVENT_RE = re.compile(rb"\[\s*(\d+)\.(\d+)\]\s+([0-9a-f]{4})\s+([0-9a-f]{4})\s+([0-9a-f]{8})")
+
+# 设备端临时脚本位置
+REMOTE_SCRIPT = "/data/local/tmp/autotest_replay.sh"
+
+
+class TouchPanel(NamedTuple):
+    """触摸屏输入设备信息"""
+    path: str
+    max_x: int
+    max_y: int
+
+
+class TouchEvent(NamedTuple):
+    """单个输入事件，delay_us 为距上一事件的间隔"""
+    delay_us: int
+    type: int
+    code: int
+    value: int
+
+
+# —————————————————— 工具函数 ——————————————————
+
+def find_touch_panel(adb) -> TouchPanel:
+    """通过 getevent -p 找到支持多点触控坐标的输入设备"""
+    output = adb.shell("getevent -p")
+    path, axes = None, {}
+    panels = []
+    for line in output.splitlines():
+        m = _DEVICE_RE.search(line)
+        if m:
+            if path and ABS_MT_POSITION_X in axes and ABS_MT_POSITION_Y in axes:
+                panels.append(TouchPanel(path, axes[ABS_MT_POSITION_X], axes[ABS_MT_POSITION_Y]))
+            path, axes = m.group(1), {}
+            continue
+        m = _AXIS_RE.search(line)
+        if m:
+            axes[int(m.group(1), 16)] = int(m.group(2))
+    if path and ABS_MT_POSITION_X in axes and ABS_MT_POSITION_Y in axes:
+        panels.append(TouchPanel(path, axes[ABS_MT_POSITION_X], axes[ABS_MT_POSITION_Y]))
+    if not panels:
+        raise RuntimeError("未找到触摸屏输入设备")
+    return panels[0]
+
+
+def write_header(f, panel: TouchPanel) -> None:
+    f.write(_HEADER.pack(MAGIC, VERSION, 0, panel.max_x, panel.max_y, panel.path.encode()))
+
+
+def load_events(file_path: str | Path) -> tuple[TouchPanel, list[TouchEvent]]:
+    """读取二进制事件日志，返回录制时的触摸屏信息和事件列表"""
+    data = Path(file_path).read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"事件日志不完整: {file_path}")
+    magic, version, _, max_x, max_y, dev = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"不支持的事件日志格式: {file_path}")
+    panel = TouchPanel(dev.rstrip(b"\0").decode(), max_x, max_y)
+    body = memoryview(data)[_HEADER.size:]
+    usable = len(body) - len(body) % _EVENT.size
+    events = [TouchEvent(*e) for e in _EVENT.iter_unpack(body[:usable])]
+    return panel, events
+
+
+# 设备端等待函数：$1 为相对起始时刻的微秒数，$2 为没有 EPOCHREALTIME 时退化使用的相对秒数
+# mksh 的整数为 32 位，因此以起始秒为基准计算，单次回放不超过 2000 秒即可
+_SCRIPT_HEAD = """#!/system/bin/sh
+exec 3>{path} || exit 1
+typeset -Z6 f
+t0=$EPOCHREALTIME
+s0=${{t0%.*}}
+u0=${{t0#*.}}
+w() {{
+    if [ -z "$t0" ]; then
+        sleep $2
+        return
+    fi
+    t=$EPOCHREALTIME
+    d=$(( $1 - ((${{t%.*}} - s0) * 1000000 + 10#${{t#*.}} - 10#$u0) ))
+    if [ $d -gt 500 ]; then
+        f=$(( d % 1000000 ))
+        sleep $(( d / 1000000 )).$f
+    fi
+}}
+"""
+
+
+def _pack_event(e: TouchEvent, event_size: int) -> bytes:
+    """struct input_event：timeval 由内核填充，置零即可；64 位用户态为 24 字节，32 位为 16 字节"""
+    fmt = "<qqHHi" if event_size == 24 else "<llHHi"
+    return struct.pack(fmt, 0, 0, e.type, e.code, e.value)
+
+
+def build_script(
+    events: list[TouchEvent],
+    source: TouchPanel,
+    target: TouchPanel,
+    event_size: int = 24,
+) -> str:
+    """
+    生成设备端回放脚本
+    每个 SYN_REPORT 帧一次 print 写入（无 fork），帧前按绝对时刻等待
+    """
+    sx = target.max_x / source.max_x if source.max_x else 1.0
+    sy = target.max_y / source.max_y if source.max_y else 1.0
+    lines = [_SCRIPT_HEAD.format(path=target.path)]
+    frame = []
+    offset_us = last_wait_us = 0
+    for e in events:
+        offset_us += e.delay_us
+        value = e.value
+        if e.type == EV_ABS:
+            if e.code in _X_CODES:
+                value = round(value * sx)
+            elif e.code in _Y_CODES:
+                value = round(value * sy)
+        frame.append(_pack_event(e._replace(value=value), event_size))
+        if e.type == EV_SYN and e.code == SYN_REPORT:
+            if offset_us > last_wait_us:
+                lines.append(f"w {offset_us} {(offset_us - last_wait_us) / 1_000_000:.6f}")
+                last_wait_us = offset_us
+            lines.append(_print_bytes(b"".join(frame)))
+            frame = []
+    if frame:
+        lines.append(_print_bytes(b"".join(frame)))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _print_bytes(data: bytes) -> str:
+    """mksh 内建 print 以 \\0nnn 八进制转义输出任意字节，整帧一次 write"""
+    return "print -n '" + "".join(f"\\0{b:03o}" for b in data) + "' >&3"
+
+
+def _parse_events(stream) -> Iterator[TouchEvent]:
+    """逐行解析 getevent -t 输出，换算为相对间隔"""
+    last_us = None
+    for raw in stream:
+        m = _EVENT_RE.search(raw)
+        if not m:
+            continue
+        sec, frac, etype, code, value = m.groups()
+        ts_us = int(sec) * 1_000_000 + int(frac.ljust(6, b"0")[:6])
+        delay = 0 if last_us is None else max(0, ts_us - last_us)
+        last_us = ts_us
+        value = int(value, 16)
+        if value & 0x80000000:
+            value -= 1 << 32
+        yield TouchEvent(min(delay, 0xFFFFFFFF), int(etype, 16), int(code, 16), value)
+
+
+# —————————————————— 录制 / 回放 ——————————————————
+
+class TouchRecorder:
+    """
+    后台线程流式录制 getevent，直接写入事件日志，不在内存中堆积事件
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.count = 0
+        self._conn = None
+        self._thread = None
+
+    def start(self, file_path: str | Path) -> "TouchRecorder":
+        if self._thread is not None:
+            raise RuntimeError("录制已在进行中")
+        adb = self.device._adb
+        panel = find_touch_panel(adb)
+        self._conn = adb.shell(["getevent", "-t", panel.path], stream=True)
+        # 录制期间可能长时间无输入，取消读超时
+        self._conn.conn.settimeout(None)
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = path.open("wb")
+        write_header(f, panel)
+        self.count = 0
+        self._thread = threading.Thread(
+            name=f"getevent-{self.device.serial}",
+            target=self._pump,
+            args=(self._conn, f),
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("开始录制触摸事件: %s -> %s", self.device.serial, path)
+        return self
+
+    def _pump(self, conn, f) -> None:
+        stream = conn.conn.makefile("rb")
+        try:
+            for e in _parse_events(stream):
+                f.write(_EVENT.pack(*e))
+                self.count += 1
+        except (OSError, ValueError):
+            # stop() 关闭 socket 后读取会抛出异常，属于正常结束
+            pass
+        finally:
+            stream.close()
+            f.close()
+
+    def stop(self) -> int:
+        """停止录制，返回录制的事件数"""
+        if self._thread is None:
+            return self.count
+        sock = self._conn.conn
+        try:
+            # makefile 持有引用时 close() 不会真正关闭 fd，需要 shutdown 唤醒阻塞的读取
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._conn.close()
+        self._thread.join(timeout=5)
+        if self._thread.is_alive():
+            raise RuntimeError(f"getevent 读取线程未能退出: {self.device.serial}")
+        self._conn = self._thread = None
+        logger.info("结束录制触摸事件: %s, 共 %d 个事件", self.device.serial, self.count)
+        return self.count
+
+
+class TouchReplayer:
+    """
+    回放事件日志：一次推送脚本、一次 shell 执行，事件之间不再经过 adb 往返
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self._panel = None
+        self._event_size = 24
+
+    def replay(self, file_path: str | Path) -> int:
+        source, events = load_events(file_path)
+        adb = self.device._adb
+        if self._panel is None:
+            self._panel = find_touch_panel(adb)
+            # 写入输入设备的是设备端 shell，input_event 大小取决于其位数
+            abi = adb.shell("getprop ro.product.cpu.abi")
+            self._event_size = 16 if abi and "64" not in abi else 24
+        script = build_script(events, source, self._panel, self._event_size)
+        adb.sync.push(script.encode(), REMOTE_SCRIPT)
+        adb.shell(["sh", REMOTE_SCRIPT], timeout=None)
+        logger.info("回放触摸事件: %s, 共 %d 个事件", self.device.serial, len(events))
+        return len(events)
@@ -6,11 +6,14 @@
 """
 import subprocess
 
+from ..basic.trace import traced
+
 class ScrcpyController:
     def __init__(self, controller):
         self.controller = controller
         self.processes = {}
 
+    @traced("scrcpy.start", cat="scrcpy")
     def start(self, serial: str, max_width=None, bit_rate=None):
         cfg = self.controller.config
         max_width = max_width or cfg.default_max_width
@@ -23,6 +26,7 @@ class ScrcpyController:
         proc = subprocess.Popen(cmd)
         self.processes[serial] = proc
 
+    @traced("scrcpy.stop", cat="scrcpy")
     def stop(self, serial: str):
         proc = self.processes.pop(serial, None)
         if proc:
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      touch
+@time:      2025/10/20 10:15
+@author:    sMythicalBird
+"""
+"""
+基于 socket 的触摸注入（minitouch 协议）
+设备端常驻 minitouch，本地通过 adb forward 保持一条长连接，按下/移动/抬起直接写入 socket，
+不再为每次点击启动 app_process，支持多点触控；整段手势（含等待）一次写入，由设备端计时
+协议：d <contact> <x> <y> <pressure> / m ... / u <contact> / w <ms> / c（提交） / r（重置）
+minitouch 坐标按屏幕自然方向，横屏时先把当前方向的坐标转换回自然方向再缩放
+"""
+import socket
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MINITOUCH_SOCKET = "localabstract:minitouch"
+
+
+class TouchAgentError(Exception):
+    """触摸代理不可用（未安装、启动失败或连接断开）"""
+    pass
+
+
+class MinitouchClient:
+    def __init__(self, device, config):
+        self.device = device
+        self.config = config
+        self.max_contacts = 0
+        self.max_x = 0
+        self.max_y = 0
+        self.max_pressure = 0
+        self._sock: Optional[socket.socket] = None
+        self._agent = None  # 保持 shell 连接，连接关闭时设备端进程会随之退出
+        self._scale: Optional[tuple[float, float]] = None
+        self._size: tuple[int, int] = (0, 0)  # 自然方向的屏幕尺寸
+        self.rotation = 0  # 0/1/2/3 对应 0°/90°/180°/270°
+        self._rotation_at = 0.0
+        self._lock = threading.Lock()
+
+    # —————————————————— 连接 ——————————————————
+
+    def connect(self) -> "MinitouchClient":
+        if self._sock is not None:
+            return self
+        adb = self.device._adb
+        try:
+            port = adb.forward_port(MINITOUCH_SOCKET)
+            sock = self._try_connect(port)
+            if sock is None:
+                self._start_agent()
+                sock = self._try_connect(port, wait=self.config.touch_agent_timeout)
+            if sock is None:
+                raise TouchAgentError(f"无法连接触摸代理: {self.device.serial}")
+            self._sock = sock
+            self._read_banner(sock)
+            # minitouch 坐标按屏幕自然方向，取未旋转的物理尺寸
+            w, h = adb.window_size(landscape=False)
+            self._size = (w, h)
+            self._scale = (self.max_x / w, self.max_y / h)
+            self.refresh_rotation()
+        except TouchAgentError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise TouchAgentError(f"触摸代理初始化失败: {self.device.serial}: {e}") from e
+        logger.info("触摸代理已连接: %s, 最大触点 %d", self.device.serial, self.max_contacts)
+        return self
+
+    def _start_agent(self) -> None:
+        adb = self.device._adb
+        remote = self.config.touch_agent_path
+        if not adb.shell(f"ls {remote} 2>/dev/null"):
+            local = self.config.touch_agent_binary
+            if not local or not Path(local).exists():
+                raise TouchAgentError(f"设备上没有 {remote}，且未配置 touch_agent_binary")
+            adb.sync.push(local, remote, mode=0o755)
+        self._agent = adb.shell(remote, stream=True)
+
+    @staticmethod
+    def _try_connect(port: int, wait: float = 0.0) -> Optional[socket.socket]:
+        """adb forward 在代理未启动时仍会接受连接，以能否读到横幅为准；wait 为最长重试秒数"""
+        deadline = time.monotonic() + wait
+        while True:
+            sock = socket.create_connection(("127.0.0.1", port), timeout=2)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                if sock.recv(1, socket.MSG_PEEK):
+                    return sock
+            except OSError:
+                pass
+            sock.close()
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+
+    def _read_banner(self, sock: socket.socket) -> None:
+        stream = sock.makefile("rb")
+        while True:
+            line = stream.readline().decode().strip()
+            if not line:
+                raise TouchAgentError("触摸代理横幅不完整")
+            if line.startswith("^"):
+                _, contacts, max_x, max_y, pressure = line.split()
+                self.max_contacts, self.max_x, self.max_y = int(contacts), int(max_x), int(max_y)
+                self.max_pressure = int(pressure)
+            elif line.startswith("$"):
+                break
+        stream.close()
+        sock.settimeout(None)
+
+    def close(self) -> None:
+        for conn in (self._sock, self._agent):
+            if conn is not None:
+                try:
+                    conn.close()
+                except OSError:
+                    pass
+        self._sock = self._agent = None
+
+    # —————————————————— 指令 ——————————————————
+
+    def refresh_rotation(self) -> int:
+        """读取当前屏幕方向并缓存"""
+        rotation = self.device._adb.rotation()
+        if rotation != self.rotation:
+            logger.info("屏幕方向变化: %s, %d -> %d", self.device.serial, self.rotation, rotation)
+            self.rotation = rotation
+        self._rotation_at = time.monotonic()
+        return rotation
+
+    def _check_rotation(self) -> None:
+        """缓存过期时重新读取方向，每个手势最多读取一次"""
+        if time.monotonic() - self._rotation_at >= self.config.touch_rotation_interval:
+            self.refresh_rotation()
+
+    def _xy(self, x, y) -> tuple[int, int]:
+        """当前方向的屏幕坐标 -> 自然方向 -> minitouch 坐标"""
+        w, h = self._size
+        if self.rotation == 1:
+            x, y = w - y, x
+        elif self.rotation == 2:
+            x, y = w - x, h - y
+        elif self.rotation == 3:
+            x, y = y, h - x
+        sx, sy = self._scale
+        return round(x * sx), round(y * sy)
+
+    def _pressure(self) -> int:
+        return min(50, self.max_pressure) if self.max_pressure else 0
+
+    def send(self, commands: str) -> None:
+        """发送原始指令（多行），一次写入"""
+        if self._sock is None:
+            self.connect()
+        with self._lock:
+            try:
+                self._sock.sendall(commands.encode())
+            except OSError as e:
+                self.close()
+                raise TouchAgentError(f"触摸代理连接断开: {self.device.serial}") from e
+
+    def down(self, contact: int, x, y) -> str:
+        x, y = self._xy(x, y)
+        return f"d {contact} {x} {y} {self._pressure()}\n"
+
+    def move(self, contact: int, x, y) -> str:
+        x, y = self._xy(x, y)
+        return f"m {contact} {x} {y} {self._pressure()}\n"
+
+    @staticmethod
+    def up(contact: int) -> str:
+        return f"u {contact}\n"
+
+    # —————————————————— 手势 ——————————————————
+
+    def tap(self, x, y, duration_ms: int = 0) -> None:
+        self.connect()
+        self._check_rotation()
+        cmd = self.down(0, x, y) + "c\n"
+        if duration_ms:
+            cmd += f"w {duration_ms}\n"
+        self.send(cmd + self.up(0) + "c\n")
+
+    def swipe(self, x1, y1, x2, y2, duration_ms: int = 300, steps: int = 0) -> None:
+        self.gesture([[(x1, y1), (x2, y2)]], duration_ms, steps)
+
+    def gesture(self, paths: Sequence[Sequence[tuple]], duration_ms: int = 300, steps: int = 0) -> None:
+        """
+        多点手势：paths 中每条轨迹对应一个触点，按起点到终点（可含中间点）线性插值
+        例如双指缩放：gesture([[(300, 800), (100, 600)], [(500, 1000), (700, 1200)]])
+        """
+        self.connect()
+        if len(paths) > self.max_contacts:
+            raise ValueError(f"触点数超过设备上限 {self.max_contacts}")
+        self._check_rotation()
+        steps = steps or max(2, duration_ms // 10)
+        wait = max(1, duration_ms // steps)
+        lines = [self.down(i, *path[0]) for i, path in enumerate(paths)]
+        lines.append("c\n")
+        for s in range(1, steps + 1):
+            t = s / steps
+            for i, path in enumerate(paths):
+                lines.append(self.move(i, *_interpolate(path, t)))
+            lines.append(f"c\nw {wait}\n")
+        lines.extend(self.up(i) for i in range(len(paths)))
+        lines.append("c\n")
+        self.send("".join(lines))
+
+
+def _interpolate(path: Sequence[tuple], t: float) -> tuple[float, float]:
+    """在折线上按比例 t 取点"""
+    if len(path) == 1:
+        return path[0]
+    pos = t * (len(path) - 1)
+    i = min(int(pos), len(path) - 2)
+    f = pos - i
+    (x1, y1), (x2, y2) = path[i], path[i + 1]
+    return x1 + (x2 - x1) * f, y1 + (y2 - y1) * f
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      artifact_store
+@time:      2025/10/19 16:20
+@author:    sMythicalBird
+"""
+"""
+内容寻址的截图仓库
+- 以像素内容的哈希作为文件名，相同画面只落盘一次，磁盘占用与写入量随“不同画面数”增长，而非步骤数
+- 每个测试步骤记录一张基线（baselines.json），比对时先比哈希，再比缩略图，缩略图不一致时才做全尺寸比对
+- 比对一致的截图不入库，只保存新基线与不一致的画面
+"""
+import os
+import hashlib
+from pathlib import Path
+from threading import Event, Lock, get_ident
+from typing import NamedTuple, Optional
+
+import numpy as np
+from PIL import Image
+
+from config import PATHS
+from .basic import FileController
+
+
+class Artifact(NamedTuple):
+    """仓库中的一张图片"""
+    digest: str
+    path: Path
+    new: bool  # 本次是否实际写入了文件
+
+
+class DiffResult(NamedTuple):
+    """与基线的比对结果"""
+    match: bool
+    digest: str
+    baseline: Optional[str]
+    ratio: float  # 差异像素占比；缩略图比对即判定一致时为缩略图上的最大灰度差
+    bbox: Optional[tuple[int, int, int, int]] = None  # 差异区域 (left, top, right, bottom)
+
+
+class ArtifactStore:
+    """
+    用法：
+        store = ArtifactStore()
+        art = store.put(img)
+        result = store.compare("login/submit", img)
+    """
+
+    def __init__(
+        self,
+        root: Optional[str | Path] = None,
+        thumb_size: tuple[int, int] = (64, 64),
+        thumb_tolerance: float = 0.03,
+        pixel_threshold: int = 16,
+        max_diff_ratio: float = 0.001,
+    ):
+        self.root = Path(root or PATHS["res"] / "artifacts")
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "baselines.json"
+        self.thumb_size = thumb_size
+        # 缩略图逐像素最大灰度差（0~1）不超过该值时直接判定一致，用最大值而非均值，避免局部小改动被平均掉；
+        # 该捷径会掩盖缩小后看不出的改动，因此 max_diff_ratio=0（严格比对）时不使用，总是做全尺寸比对
+        self.thumb_tolerance = thumb_tolerance
+        # 全尺寸比对：通道差超过 pixel_threshold 视为变化像素，变化占比不超过 max_diff_ratio 判定一致
+        self.pixel_threshold = pixel_threshold
+        self.max_diff_ratio = max_diff_ratio
+
+        self._fc = FileController()
+        self._lock = Lock()
+        self._known: set[str] = set()
+        self._writing: dict[str, Event] = {}  # 正在写入的哈希，同一画面只由一个线程写盘
+        self._thumbs: dict[str, np.ndarray] = {}
+        self._baselines: dict[str, str] = (
+            self._fc.read_json(self.index_path) if self._fc.exists(self.index_path) else {}
+        )
+
+    # —————————————————— 存取 ——————————————————
+
+    @staticmethod
+    def digest(img: Image.Image) -> str:
+        """按像素内容计算哈希，与 PNG 编码参数无关"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{img.mode}:{img.width}x{img.height}:".encode())
+        h.update(img.tobytes())
+        return h.hexdigest()
+
+    def path_of(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.png"
+
+    def put(self, img: Image.Image) -> Artifact:
+        """存入图片，已存在的画面不重复写入；多台设备并发存入同一画面时只写一次"""
+        digest = self.digest(img)
+        path = self.path_of(digest)
+        while True:
+            with self._lock:
+                if digest in self._known:
+                    return Artifact(digest, path, False)
+                writing = self._writing.get(digest)
+                if writing is None:
+                    writing = self._writing[digest] = Event()
+                    break
+            # 其他线程正在写入同一画面，等它完成后重新检查（写入失败时由本线程接手）
+            writing.wait()
+        try:
+            new = self._write(img, path)
+            with self._lock:
+                self._known.add(digest)
+        finally:
+            with self._lock:
+                del self._writing[digest]
+            writing.set()
+        return Artifact(digest, path, new)
+
+    @staticmethod
+    def _write(img: Image.Image, path: Path) -> bool:
+        """写入临时文件后替换，返回是否实际写入"""
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{get_ident()}.tmp")
+        try:
+            img.save(tmp, format="PNG")
+            os.replace(tmp, path)
+        except FileNotFoundError:
+            # 其他进程已写入同一对象
+            if not path.exists():
+                raise
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
+        return True
+
+    def load(self, digest: str) -> Image.Image:
+        img = Image.open(self.path_of(digest))
+        img.load()
+        return img
+
+    # —————————————————— 基线 ——————————————————
+
+    def baseline(self, step: str) -> Optional[str]:
+        return self._baselines.get(step)
+
+    def set_baseline(self, step: str, img_or_digest: Image.Image | str) -> str:
+        """把图片（或已入库的哈希）设为某一步骤的基线"""
+        if isinstance(img_or_digest, Image.Image):
+            digest = self.put(img_or_digest).digest
+        else:
+            digest = img_or_digest
+        with self._lock:
+            self._baselines[step] = digest
+            self._fc.write_json(self._baselines, self.index_path)
+        return digest
+
+    def compare(self, step: str, img: Image.Image, store: bool = True) -> DiffResult:
+        """
+        与步骤基线比对；没有基线时把当前图片登记为基线并视为一致
+        store=True 时只有登记基线或比对不一致的图片才入库，一致的画面不再写盘
+        """
+        digest = self.digest(img)
+        base = self._baselines.get(step)
+        if base is None:
+            if store:
+                self.set_baseline(step, img)
+            return DiffResult(True, digest, None, 0.0)
+        if base == digest:
+            return DiffResult(True, digest, base, 0.0)
+        result = self._diff(img, digest, base)
+        if store and not result.match:
+            self.put(img)
+        return result
+
+    def _diff(self, img: Image.Image, digest: str, base: str) -> DiffResult:
+        # 1. 缩略图比对（严格比对时跳过）
+        if self.max_diff_ratio:
+            score = float(np.abs(self._thumb(img) - self._baseline_thumb(base)).max()) / 255
+            if score <= self.thumb_tolerance:
+                return DiffResult(True, digest, base, score)
+
+        # 2. 全尺寸比对
+        ref = self.load(base)
+        if ref.size != img.size:
+            return DiffResult(False, digest, base, 1.0, (0, 0, img.width, img.height))
+        a = np.asarray(img.convert("RGB"), dtype=np.int16)
+        b = np.asarray(ref.convert("RGB"), dtype=np.int16)
+        changed = (np.abs(a - b) > self.pixel_threshold).any(axis=2)
+        ratio = float(changed.mean())
+        bbox = None
+        if ratio:
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            bbox = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+        return DiffResult(ratio <= self.max_diff_ratio, digest, base, ratio, bbox)
+
+    def _thumb(self, img: Image.Image) -> np.ndarray:
+        return np.asarray(img.convert("L").resize(self.thumb_size, Image.BILINEAR), dtype=np.int16)
+
+    def _baseline_thumb(self, digest: str) -> np.ndarray:
+        thumb = self._thumbs.get(digest)
+        if thumb is None:
+            thumb = self._thumbs[digest] = self._thumb(self.load(digest))
+        return thumb
@@ -28,6 +28,12 @@ from .logger import (
 
 from .file_controller import FileController
 
+"""
+追踪模块
+tracer 收集 span，traced 装饰器用于热点函数，导出 Chrome trace JSON
+"""
+from .trace import tracer, traced
+
 
 
 __all__ = [
@@ -39,6 +45,8 @@ __all__ = [
     "critical",
     "logger_manager",
     "FileController",
+    "tracer",
+    "traced",
 ]
 
 
@@ -13,6 +13,8 @@ from pathlib import Path
 from typing import Any, Dict, List, Union, Optional
 from threading import Lock
 
+from .trace import traced
+
 # 类型别名（现代 Python 风格）
 FilePath = str | Path
 Data = Dict[str, Any] | List[Any] | Any
@@ -80,6 +82,7 @@ class FileController:
         """获取扩展名（小写）"""
         return Path(file_path).suffix.lower()
 
+    @traced("file.delete", cat="file")
     def delete(self, file_path: FilePath) -> bool:
         """删除文件"""
         try:
@@ -91,6 +94,7 @@ class FileController:
 
     # —————————————————— 读写操作 ——————————————————
 
+    @traced("file.read_text", cat="file")
     def read_text(self, file_path: FilePath, encoding: str = 'utf-8') -> str:
         """读取文本"""
         try:
@@ -101,6 +105,7 @@ class FileController:
         except Exception as e:
             raise FileOperationError(f"读取文本失败: {file_path}") from e
 
+    @traced("file.write_text", cat="file")
     def write_text(self, content: str, file_path: FilePath, encoding: str = 'utf-8') -> None:
         """写入文本"""
         try:
@@ -110,6 +115,7 @@ class FileController:
         except Exception as e:
             raise FileOperationError(f"写入文本失败: {file_path}") from e
 
+    @traced("file.append_text", cat="file")
     def append_text(self, content: str, file_path: FilePath, encoding: str = 'utf-8') -> None:
         """追加文本"""
         try:
@@ -122,6 +128,7 @@ class FileController:
 
     # —————————————————— JSON ——————————————————
 
+    @traced("file.read_json", cat="file")
     def read_json(self, file_path: FilePath, encoding: str = 'utf-8') -> dict | list:
         """读取 JSON"""
         try:
@@ -132,6 +139,7 @@ class FileController:
         except Exception as e:
             raise FileOperationError(f"读取 JSON 失败: {file_path}") from e
 
+    @traced("file.write_json", cat="file")
     def write_json(
         self,
         data: dict | list,
@@ -149,6 +157,7 @@ class FileController:
 
     # —————————————————— CSV ——————————————————
 
+    @traced("file.read_csv", cat="file")
     def read_csv(
         self,
         file_path: FilePath,
@@ -165,6 +174,7 @@ class FileController:
         except Exception as e:
             raise FileOperationError(f"读取 CSV 失败: {file_path}") from e
 
+    @traced("file.write_csv", cat="file")
     def write_csv(
         self,
         data: list[dict],
@@ -190,6 +200,7 @@ class FileController:
 
     # —————————————————— Pickle ——————————————————
 
+    @traced("file.read_pickle", cat="file")
     def read_pickle(self, file_path: FilePath) -> Any:
         """读取 Pickle"""
         try:
@@ -200,6 +211,7 @@ class FileController:
         except Exception as e:
             raise FileOperationError(f"读取 Pickle 失败: {file_path}") from e
 
+    @traced("file.write_pickle", cat="file")
     def write_pickle(self, obj: Any, file_path: FilePath) -> None:
         """写入 Pickle"""
         try:
@@ -15,6 +15,7 @@ from zoneinfo import ZoneInfo
 import tomllib  # Python 3.11+ 内置
 import sys
 from config import PATHS
+from .trace import tracer, traced, SpanFilter, TraceLogHandler
 
 # =============================
 # 自定义时区格式化器
@@ -99,6 +100,16 @@ class StructuredLogger:
         file_handler.setFormatter(file_formatter)
         root_logger.addHandler(file_handler)
 
+        # 格式串中的 {span} 由 SpanFilter 填充，未开启追踪时为 "-"
+        for handler in root_logger.handlers:
+            handler.addFilter(SpanFilter())
+
+        # =============================
+        # 3. span 追踪（可选）
+        # =============================
+        if self.config.get("trace", {}).get("enabled", False):
+            self.enable_tracing()
+
     def _create_formatter(self, handler_type: str) -> logging.Formatter:
         """根据处理器类型创建格式器"""
         use_json = self.config.get("use_json", False)
@@ -168,6 +179,27 @@ class StructuredLogger:
         datefmt = fmt_config.get("datefmt")
         return TimezoneFormatter(fmt=fmt, datefmt=datefmt, timezone=timezone)
 
+    def enable_tracing(self) -> None:
+        """开启 span 追踪：日志行作为瞬时事件写入 trace，各处理器的耗时记为 span"""
+        tracer.enable()
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers:
+            if isinstance(handler, TraceLogHandler) or getattr(handler, "_traced", False):
+                continue
+            if not any(isinstance(f, SpanFilter) for f in handler.filters):
+                handler.addFilter(SpanFilter())
+            handler.emit = traced(f"log.{type(handler).__name__}", cat="log")(handler.emit)
+            handler._traced = True
+        if not any(isinstance(h, TraceLogHandler) for h in root_logger.handlers):
+            root_logger.addHandler(TraceLogHandler())
+
+    def export_trace(self, file_path: Optional[Path] = None) -> Path:
+        """导出 Chrome trace JSON，默认写到日志目录"""
+        if file_path is None:
+            output = self.config.get("trace", {}).get("output", "trace.json")
+            file_path = PATHS["logs"] / output
+        return tracer.export(file_path)
+
     def get_logger(self, name: str) -> logging.Logger:
         """获取按模块命名的日志器"""
         return logging.getLogger(name)
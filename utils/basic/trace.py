@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      trace
+@time:      2025/10/18 14:20
+@author:    sMythicalBird
+"""
+"""
+轻量级热点追踪模块，按线程记录 span，导出 Chrome trace JSON（可直接在 Perfetto / chrome://tracing 打开）
+关闭时 span() 返回共享的空对象、traced 装饰器只多一次布尔判断，几乎没有开销
+"""
+import os
+import json
+import logging
+import functools
+import threading
+from collections import deque
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Callable, Optional
+
+
+class _NullSpan:
+    """追踪关闭时使用的空 span"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end = perf_counter_ns()
+        self.tracer._stack().pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._add({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": self.tracer._us(self.start),
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.args,
+        })
+        return False
+
+
+class Tracer:
+    """
+    span 收集器
+    事件存放在定长 deque 中，append 线程安全，内存有上限
+    """
+
+    def __init__(self, max_events: int = 1_000_000):
+        self.enabled = False
+        self._events: deque = deque(maxlen=max_events)
+        self._threads: dict[int, str] = {}
+        self._local = threading.local()
+        self._origin = perf_counter_ns()
+
+    # —————————————————— 开关 ——————————————————
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        # 线程名保留：各线程的 span 栈已建立，清空后不会再登记
+        self._events.clear()
+        self._origin = perf_counter_ns()
+
+    # —————————————————— 记录 ——————————————————
+
+    def span(self, name: str, cat: str = "default", **args: Any):
+        """上下文管理器：with tracer.span("device.tap", serial=...): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def instant(self, name: str, cat: str = "default", **args: Any) -> None:
+        """记录瞬时事件（如日志行）"""
+        if not self.enabled:
+            return
+        self._add({
+            "name": name,
+            "cat": cat,
+            "ph": "i",
+            "s": "t",
+            "ts": self._us(perf_counter_ns()),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def current(self) -> Optional[str]:
+        """当前线程正在执行的 span 名称"""
+        stack = self._stack()
+        return stack[-1].name if stack else None
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._threads[threading.get_ident()] = threading.current_thread().name
+        return stack
+
+    def _us(self, ns: int) -> float:
+        return (ns - self._origin) / 1000
+
+    def _add(self, event: dict) -> None:
+        self._events.append(event)
+
+    # —————————————————— 导出 ——————————————————
+
+    def events(self) -> list[dict]:
+        """当前已记录事件的快照，附带线程名元数据"""
+        pid = os.getpid()
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        return meta + list(self._events)
+
+    def export(self, file_path: str | Path) -> Path:
+        """导出 Chrome trace JSON"""
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+
+# 全局追踪器，设置环境变量 AUTOTEST_TRACE=1 时默认开启
+tracer = Tracer()
+if os.environ.get("AUTOTEST_TRACE"):
+    tracer.enable()
+
+
+def traced(name: Optional[str] = None, cat: str = "default") -> Callable:
+    """
+    函数装饰器，调用时记录一个 span
+    未开启追踪时直接调用原函数
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, cat, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# =============================
+# 日志关联
+# =============================
+class SpanFilter(logging.Filter):
+    """给日志记录注入当前 span 名称（record.span，没有时为 "-"），供格式串中的 {span} 使用"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.span = (tracer.current() if tracer.enabled else None) or "-"
+        return True
+
+
+class TraceLogHandler(logging.Handler):
+    """把日志行作为瞬时事件写入 trace，与同线程的 span 对齐显示"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not tracer.enabled:
+            return
+        tracer.instant(
+            f"{record.levelname}: {record.getMessage()}"[:200],
+            cat="log",
+            logger=record.name,
+            location=f"{record.filename}:{record.lineno}",
+            span=tracer.current(),
+        )
+
+
+__all__ = [
+    "Tracer",
+    "tracer",
+    "traced",
+    "SpanFilter",
+    "TraceLogHandler",
+]
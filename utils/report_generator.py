@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+@file:      report_generator
+@time:      2025/10/19 13:10
+@author:    sMythicalBird
+"""
+"""
+流式测试报告生成器
+测试结果逐条写入 JUnit / HTML 的片段文件，内存占用与用例数量无关；
+render() 把当前统计写成文件头，再分块拷贝片段生成完整报告，运行中途也可随时调用生成阶段性报告。
+截图只以相对路径引用，不嵌入报告
+"""
+import os
+import re
+import html
+import time
+import shutil
+import socket
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from config import PATHS
+
+STATUSES = ("passed", "failed", "error", "skipped")
+
+# 终端颜色码（如 log_exception 输出的 \033[1;31m）与 XML 1.0 不允许的控制字符
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _clean(text: str) -> str:
+    """去掉颜色码与非法控制字符，保证 junit.xml 可被解析"""
+    return _INVALID_XML_RE.sub("", _ANSI_RE.sub("", text))
+
+
+def _text(text: str) -> str:
+    return escape(_clean(text))
+
+
+def _attr(text: str) -> str:
+    return quoteattr(_clean(text))
+
+
+@dataclass
+class TestResult:
+    """单条用例结果"""
+    __test__ = False  # 避免被 pytest 当作测试类收集
+
+    name: str
+    status: str = "passed"
+    classname: str = ""
+    duration: float = 0.0
+    message: str = ""
+    details: str = ""
+    screenshots: list[str | Path] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.status not in STATUSES:
+            raise ValueError(f"未知的用例状态: {self.status}")
+
+
+class ReportGenerator:
+    """
+    用法：
+        report = ReportGenerator(suite_name="nightly")
+        for result in results:          # 任意可迭代对象 / 生成器
+            report.add(result)
+        report.close()                  # 生成最终的 junit.xml 与 report.html
+    """
+
+    def __init__(
+        self,
+        output_dir: Optional[str | Path] = None,
+        suite_name: str = "AutoTestTool",
+        partial_every: int = 0,
+    ):
+        self.output_dir = Path(output_dir or PATHS["logs"] / "report")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.suite_name = suite_name
+        # 每新增多少条结果自动刷新一次阶段性报告，0 表示不自动刷新
+        self.partial_every = partial_every
+        self.junit_path = self.output_dir / "junit.xml"
+        self.html_path = self.output_dir / "report.html"
+
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.total_time = 0.0
+        self.started = time.time()
+        self.finished = False
+        self._lock = Lock()
+        self._junit_part = (self.output_dir / "junit.xml.part").open("w+", encoding="utf-8")
+        self._html_part = (self.output_dir / "report.html.part").open("w+", encoding="utf-8")
+
+    # —————————————————— 写入结果 ——————————————————
+
+    def add(self, result: TestResult) -> None:
+        with self._lock:
+            if self.finished:
+                raise RuntimeError("报告已关闭")
+            self._junit_part.write(self._junit_case(result))
+            self._html_part.write(self._html_row(result))
+            self.counts[result.status] += 1
+            self.total_time += result.duration
+            if self.partial_every and self.total % self.partial_every == 0:
+                self._render()
+
+    def consume(self, results: Iterable[TestResult]) -> "ReportGenerator":
+        """逐条消费结果流"""
+        for result in results:
+            self.add(result)
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    # —————————————————— 生成报告 ——————————————————
+
+    def render(self) -> None:
+        """按当前进度生成报告（运行中调用即为阶段性报告）"""
+        with self._lock:
+            if self.finished:
+                # close() 已生成最终报告，片段文件也已删除
+                return
+            self._render()
+
+    def close(self) -> None:
+        """生成最终报告并删除片段文件"""
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            self._render()
+            for part in (self._junit_part, self._html_part):
+                part.close()
+                Path(part.name).unlink(missing_ok=True)
+
+    def __enter__(self) -> "ReportGenerator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _render(self) -> None:
+        self._assemble(self.junit_path, self._junit_head(), self._junit_part, "</testsuite>\n</testsuites>\n")
+        self._assemble(self.html_path, self._html_head(), self._html_part, "</tbody></table>\n</body></html>\n")
+
+    @staticmethod
+    def _assemble(target: Path, head: str, part, tail: str) -> None:
+        """写入临时文件后替换，读者永远看不到写了一半的报告"""
+        part.flush()
+        tmp = target.with_name(target.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as out, open(part.name, "r", encoding="utf-8") as src:
+            out.write(head)
+            shutil.copyfileobj(src, out)
+            out.write(tail)
+        os.replace(tmp, target)
+
+    # —————————————————— JUnit ——————————————————
+
+    def _junit_head(self) -> str:
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started))
+        attrs = (
+            f"name={_attr(self.suite_name)} tests=\"{self.total}\" "
+            f"failures=\"{self.counts['failed']}\" errors=\"{self.counts['error']}\" "
+            f"skipped=\"{self.counts['skipped']}\" time=\"{self.total_time:.3f}\" "
+            f"timestamp=\"{timestamp}\" hostname={_attr(socket.gethostname())}"
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f"<testsuites {attrs}>\n<testsuite {attrs}>\n"
+        )
+
+    def _junit_case(self, r: TestResult) -> str:
+        attrs = f"classname={_attr(r.classname)} name={_attr(r.name)} time=\"{r.duration:.3f}\""
+        body = ""
+        if r.status in ("failed", "error"):
+            tag = "failure" if r.status == "failed" else "error"
+            body = f"<{tag} message={_attr(r.message)}>{_text(r.details)}</{tag}>"
+        elif r.status == "skipped":
+            body = f"<skipped message={_attr(r.message)}/>"
+        if r.screenshots:
+            paths = "\n".join(f"[[ATTACHMENT|{self._rel(p)}]]" for p in r.screenshots)
+            body += f"<system-out>{_text(paths)}</system-out>"
+        return f"<testcase {attrs}>{body}</testcase>\n" if body else f"<testcase {attrs}/>\n"
+
+    # —————————————————— HTML ——————————————————
+
+    def _html_head(self) -> str:
+        state = "已完成" if self.finished else "运行中"
+        summary = " ".join(f'<span class="{s}">{s}: {n}</span>' for s, n in self.counts.items())
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(_clean(self.suite_name))}</title>
+<style>
+body {{ font-family: sans-serif; margin: 16px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; }}
+.passed {{ color: #2e7d32; }} .failed, .error {{ color: #c62828; }} .skipped {{ color: #757575; }}
+pre {{ margin: 0; white-space: pre-wrap; }}
+img {{ max-height: 160px; }}
+</style></head><body>
+<h1>{html.escape(_clean(self.suite_name))}</h1>
+<p>状态：{state} | 用例：{self.total} | 耗时：{self.total_time:.2f}s | {summary}</p>
+<table><thead><tr><th>用例</th><th>状态</th><th>耗时(s)</th><th>信息</th><th>截图</th></tr></thead><tbody>
+"""
+
+    def _html_row(self, r: TestResult) -> str:
+        name = html.escape(_clean(f"{r.classname}.{r.name}" if r.classname else r.name))
+        info = html.escape(_clean(r.message))
+        if r.details:
+            info += f"<pre>{html.escape(_clean(r.details))}</pre>"
+        shots = " ".join(
+            f'<a href="{html.escape(self._rel(p))}"><img loading="lazy" src="{html.escape(self._rel(p))}"></a>'
+            for p in r.screenshots
+        )
+        return (
+            f'<tr><td>{name}</td><td class="{r.status}">{r.status}</td>'
+            f"<td>{r.duration:.3f}</td><td>{info}</td><td>{shots}</td></tr>\n"
+        )
+
+    def _rel(self, path: str | Path) -> str:
+        """截图路径转为相对报告目录的路径"""
+        try:
+            return Path(os.path.relpath(Path(path).resolve(), self.output_dir.resolve())).as_posix()
+        except ValueError:
+            # Windows 下跨盘符无法求相对路径
+            return Path(path).resolve().as_posix()